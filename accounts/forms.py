@@ -14,7 +14,8 @@ class EmpresaForm(forms.ModelForm):
     class Meta:
         model = Empresa
         fields = ['nome', 'cnpj', 'telefone', 'email', 'endereco', 'logo', 
-                 'cor_principal', 'cor_secundaria', 'cor_acento', 'tema_escuro', 'cidade', 'instagram', 'whatsapp']
+                 'cor_principal', 'cor_secundaria', 'cor_acento', 'tema_escuro', 'cidade', 'instagram', 'whatsapp',
+                 'capacidade_diaria']
         widgets = {
             'nome': forms.TextInput(attrs={'class': 'form-control'}),
             'cnpj': forms.TextInput(attrs={'class': 'form-control'}),
@@ -41,6 +42,7 @@ class EmpresaForm(forms.ModelForm):
                 'style': 'height: 40px;'
             }),
             'tema_escuro': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'capacidade_diaria': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
         }
     
     def clean_logo(self):
@@ -55,6 +57,18 @@ class EmpresaForm(forms.ModelForm):
                 pass
         return logo
 
+    def save(self, commit=True):
+        empresa = super().save(commit)
+        if commit and 'logo' in self.changed_data and empresa.logo:
+            # Deixa prontas as versões redimensionadas usadas nos PDFs e PNGs
+            from orcamentos.logos import gerar_variantes
+
+            try:
+                gerar_variantes(empresa.logo.path)
+            except (OSError, ValueError, NotImplementedError):
+                pass
+        return empresa
+
 class CustomPasswordChangeForm(PasswordChangeForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_empresa_cidade_empresa_instagram_empresa_whatsapp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresa',
+            name='capacidade_diaria',
+            field=models.PositiveSmallIntegerField(default=3, verbose_name='Eventos por dia'),
+        ),
+    ]
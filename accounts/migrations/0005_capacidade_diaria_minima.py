@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:29
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def corrigir_capacidade_zero(apps, schema_editor):
+    # Capacidade 0 marcava todos os dias da agenda como lotados; volta ao padrão
+    Empresa = apps.get_model('accounts', 'Empresa')
+    Empresa.objects.filter(capacidade_diaria=0).update(capacidade_diaria=3)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_empresa_capacidade_diaria'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='empresa',
+            name='capacidade_diaria',
+            field=models.PositiveSmallIntegerField(default=3, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Eventos por dia'),
+        ),
+        migrations.RunPython(corrigir_capacidade_zero, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 
 class Empresa(models.Model):
@@ -27,6 +28,11 @@ class Empresa(models.Model):
     # Configurações de tema
     tema_escuro = models.BooleanField(default=False, verbose_name='Tema Escuro')
     
+    # Agenda
+    capacidade_diaria = models.PositiveSmallIntegerField(
+        _('Eventos por dia'), default=3, validators=[MinValueValidator(1)]
+    )
+    
     class Meta:
         verbose_name = _('Empresa')
         verbose_name_plural = _('Empresas')
@@ -118,6 +118,41 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Documentos (PDF) dos orçamentos
+# Storage dos arquivos gerados: FileSystemStorage (padrão) ou orcamentos.armazenamento.ArmazenamentoDeduplicado
+# (endereçado pelo conteúdo). Arquivos descartados são apagados em lote por `manage.py limpar_documentos`.
+DOCUMENTOS_STORAGE = env('DOCUMENTOS_STORAGE', default='django.core.files.storage.FileSystemStorage')
+# Com o cache desligado os PDFs são renderizados em memória a cada download, sem gravar nada em disco
+# (a fila depende do cache).
+DOCUMENTOS_CACHE = env.bool('DOCUMENTOS_CACHE', default=True)
+# Com a fila ativa, os documentos são pré-renderizados por `manage.py processar_documentos`
+# e o download nunca renderiza dentro da requisição.
+DOCUMENTOS_FILA = env.bool('DOCUMENTOS_FILA', default=False)
+DOCUMENTOS_FILA_MAX_TENTATIVAS = env.int('DOCUMENTOS_FILA_MAX_TENTATIVAS', default=3)
+# Resolução das imagens (PNG/JPEG/WebP) rasterizadas a partir do PDF, entre 72 e 300 dpi
+DOCUMENTOS_IMAGEM_DPI = env.int('DOCUMENTOS_IMAGEM_DPI', default=150)
+# Processos usados na exportação em lote (0 = um por núcleo; 1 renderiza no próprio processo)
+EXPORTACAO_PROCESSOS = env.int('EXPORTACAO_PROCESSOS', default=0)
+# O mesmo para a exportação pela tela. Padrão 1: a requisição não abre processos (que recarregariam o Django);
+# só vale a pena aumentar com workers dedicados a isso
+EXPORTACAO_PROCESSOS_WEB = env.int('EXPORTACAO_PROCESSOS_WEB', default=1)
+# Pasta com os .ttf dos PNGs de compartilhamento (vazio = só as fontes do sistema)
+FONTES_DIR = env('FONTES_DIR', default='')
+
+# Instrumentação por requisição (consultas SQL, tempo de banco e de render), exibida em /orcamentos/desempenho/
+# só para staff. Desligada por padrão; o registro fica em memória, por processo.
+INSTRUMENTACAO = env.bool('INSTRUMENTACAO', default=False)
+INSTRUMENTACAO_REGISTROS = env.int('INSTRUMENTACAO_REGISTROS', default=500)
+INSTRUMENTACAO_CONSULTAS_LENTAS = env.int('INSTRUMENTACAO_CONSULTAS_LENTAS', default=5)
+if INSTRUMENTACAO:
+    # Primeiro da lista para contar também as consultas de sessão e autenticação
+    MIDDLEWARE.insert(0, 'orcamentos.instrumentacao.InstrumentacaoMiddleware')
+
+# Listas de orçamentos e clientes paginadas por cursor. O total exibido é um COUNT do filtro inteiro:
+# 'exata' (a cada requisição), 'cache' (reaproveitado por PAGINACAO_CONTAGEM_TTL segundos) ou 'nenhuma'
+PAGINACAO_CONTAGEM = env('PAGINACAO_CONTAGEM', default='exata')
+PAGINACAO_CONTAGEM_TTL = env.int('PAGINACAO_CONTAGEM_TTL', default=60)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 USE_L10N = True
@@ -25,17 +25,18 @@ class OrcamentoItemInline(admin.TabularInline):  # ou admin.StackedInline
 @admin.register(Orcamento)
 class OrcamentoAdmin(admin.ModelAdmin):
     list_display = ['id', 'cliente', 'data_criacao', 'data_evento', 'status', 'calcular_total']
+    list_select_related = ['cliente']
     list_filter = ['data_criacao', 'data_evento', 'status']
     search_fields = ['cliente__nome', 'observacoes']
     list_editable = ['status']
-    readonly_fields = ['data_criacao', 'calcular_total_display']
+    readonly_fields = ['data_criacao', 'subtotal', 'calcular_total_display', 'saldo']
     inlines = [OrcamentoItemInline]
     fieldsets = [
         ('Informações Básicas', {
             'fields': ['cliente', 'data_evento', 'status']
         }),
         ('Valores', {
-            'fields': ['desconto_geral', 'calcular_total_display']
+            'fields': ['desconto_geral', 'valor_adicional', 'valor_pago', 'subtotal', 'calcular_total_display', 'saldo']
         }),
         ('Arquivos', {
             'fields': ['pdf', 'png'],
@@ -48,13 +49,13 @@ class OrcamentoAdmin(admin.ModelAdmin):
     ]
     
     def calcular_total_display(self, obj):
-        return f"R$ {obj.calcular_total():.2f}"
+        return f"R$ {obj.total:.2f}"
     calcular_total_display.short_description = 'Total do Orçamento'
     
-    # Para exibir o total na listagem
+    # Para exibir o total na listagem (coluna persistida, ordenável no banco)
+    @admin.display(description='Total', ordering='total')
     def calcular_total(self, obj):
-        return f"R$ {obj.calcular_total():.2f}"
-    calcular_total.short_description = 'Total'
+        return f"R$ {obj.total:.2f}"
 
 @admin.register(OrcamentoItem)
 class OrcamentoItemAdmin(admin.ModelAdmin):
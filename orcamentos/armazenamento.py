@@ -0,0 +1,51 @@
+"""
+Storage dos documentos gerados (PDF/PNG dos orçamentos).
+
+Todos os acessos aos arquivos passam pela API de Storage do Django. O backend
+é escolhido em settings.DOCUMENTOS_STORAGE:
+
+- django.core.files.storage.FileSystemStorage: disco local em MEDIA_ROOT (padrão)
+- orcamentos.armazenamento.ArmazenamentoDeduplicado: endereçado pelo conteúdo,
+  arquivos idênticos são gravados uma única vez
+
+Como um arquivo deduplicado pode ser referenciado por vários registros, nada é
+apagado direto nas views: os nomes vão para a fila de ArquivoDescartado e são
+removidos em lote (documentos.limpar_arquivos_descartados).
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
+
+class ArmazenamentoDeduplicado(FileSystemStorage):
+    """
+    FileSystemStorage endereçado pelo conteúdo: o nome final é o sha256 dos
+    bytes, dentro da pasta pedida. Gravar de novo um conteúdo que já existe
+    não escreve nada e devolve o nome existente.
+    """
+
+    def _save(self, name, content):
+        sha = hashlib.sha256()
+        content.seek(0)
+        for bloco in content.chunks():
+            sha.update(bloco)
+        content.seek(0)
+
+        pasta = os.path.dirname(name)
+        extensao = os.path.splitext(name)[1]
+        digest = sha.hexdigest()
+        nome = os.path.join(pasta, digest[:2], f"{digest}{extensao}")
+        if self.exists(nome):
+            return nome
+        return super()._save(nome, content)
+
+
+@lru_cache(maxsize=None)
+def storage_documentos():
+    """Instância do storage configurado para os documentos (usado pelos FileFields)"""
+    backend = getattr(settings, 'DOCUMENTOS_STORAGE', 'django.core.files.storage.FileSystemStorage')
+    return import_string(backend)()
@@ -0,0 +1,306 @@
+"""
+Dados sintéticos e benchmark das rotas e renders mais usados.
+
+semear() cria empresas de teste (nome começando com PREFIXO_EMPRESA) com
+clientes, catálogo e orçamentos espalhados por vários anos, em bulk_create.
+Os totais persistidos, o resumo mensal e o índice de busca são calculados na
+própria carga, já que bulk_create não dispara os signals.
+
+medir() roda cada cenário algumas vezes contra uma dessas empresas e devolve
+consultas SQL e latências (p50/p95). comparar() confronta o resultado com um
+baseline gravado em JSON e aponta as regressões acima do limite.
+"""
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from datetime import time as hora, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Empresa, Usuario
+from relatorios.models import ResumoMensal
+
+from .busca import reconstruir_indice
+from .contexto import RenderContext, orcamento_para_dict
+from .models import CENTAVOS, Cliente, Item, Orcamento, OrcamentoItem, calcular_valor_linha
+
+PREFIXO_EMPRESA = '[bench]'
+
+NOMES = (
+    'Ana', 'Beatriz', 'Carla', 'Daniela', 'Eduarda', 'Fernanda', 'Gabriela', 'Helena', 'Isabela', 'Juliana',
+    'Bruno', 'Carlos', 'Diego', 'Eduardo', 'Felipe', 'Gustavo', 'Henrique', 'João', 'Lucas', 'Marcelo',
+)
+SOBRENOMES = (
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Rodrigues', 'Almeida', 'Nascimento',
+    'Carvalho', 'Araújo', 'Ribeiro', 'Gomes', 'Martins', 'Barbosa', 'Rocha', 'Dias', 'Teixeira', 'Moreira',
+)
+# (categoria, nomes, faixa de preço)
+CATALOGO = (
+    ('brinquedo', ('Pula-pula', 'Tobogã inflável', 'Piscina de bolinhas', 'Cama elástica', 'Castelo inflável'), (150, 600)),
+    ('comida', ('Pipoca', 'Algodão doce', 'Cachorro-quente', 'Crepe', 'Churros'), (80, 350)),
+    ('servico', ('Monitor', 'Recreação', 'Pintura facial', 'Mágico', 'Fotógrafo'), (120, 800)),
+    ('decoracao', ('Painel temático', 'Arco de balões', 'Mesa do bolo', 'Centro de mesa'), (100, 900)),
+    ('buffet', ('Buffet infantil', 'Salgados', 'Docinhos', 'Bolo'), (300, 2500)),
+)
+TIPOS_EVENTO = ('Aniversário', 'Aniversário', 'Aniversário', 'Batizado', 'Confraternização', 'Festa escolar')
+BAIRROS = ('Centro', 'Jardim América', 'Vila Nova', 'Boa Vista', 'Santa Cruz', 'São José')
+
+
+def _status(data_evento, hoje, rnd):
+    """Eventos passados tendem a concluídos/cancelados; futuros a pendentes/confirmados"""
+    if data_evento < hoje:
+        return rnd.choices(('concluido', 'cancelado', 'confirmado', 'reagendar'), (70, 18, 8, 4))[0]
+    return rnd.choices(('pendente', 'confirmado', 'cancelado', 'reagendar'), (55, 35, 6, 4))[0]
+
+
+def _telefone(rnd):
+    return f"(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}"
+
+
+def _criar_empresa(indice, clientes, itens, orcamentos, itens_por_orcamento, anos, rnd, lote):
+    empresa = Empresa.objects.create(
+        nome=f'{PREFIXO_EMPRESA} Empresa {indice}',
+        telefone=_telefone(rnd),
+        cidade='São Paulo',
+        whatsapp=_telefone(rnd),
+        capacidade_diaria=rnd.randint(2, 5),
+    )
+    # Sem senha utilizável: o benchmark entra com force_login
+    usuario = Usuario.objects.create_user(
+        username=f'bench_{empresa.pk}',
+        first_name='Bench',
+        last_name=str(empresa.pk),
+        empresa=empresa,
+    )
+
+    Cliente.objects.bulk_create(
+        [
+            Cliente(empresa=empresa, nome=f'{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}', telefone=_telefone(rnd))
+            for _ in range(clientes)
+        ],
+        batch_size=lote,
+    )
+
+    catalogo = []
+    for n in range(itens):
+        categoria, nomes, (minimo, maximo) = CATALOGO[n % len(CATALOGO)]
+        nome = f'{nomes[(n // len(CATALOGO)) % len(nomes)]} {n // (len(CATALOGO) * len(nomes)) + 1}'
+        valor = Decimal(rnd.randint(minimo, maximo))
+        catalogo.append(Item(
+            empresa=empresa,
+            nome=nome,
+            descricao=f'{nome} - {categoria}',
+            valor_unitario=valor,
+            investimento=(valor * Decimal('0.3')).quantize(CENTAVOS),
+            categoria=categoria,
+            disponivel=rnd.random() > 0.05,
+        ))
+    Item.objects.bulk_create(catalogo, batch_size=lote)
+
+    # Recarregados do banco: nem todo backend devolve as PKs do bulk_create
+    id_clientes = list(Cliente.objects.filter(empresa=empresa).values_list('id', flat=True))
+    catalogo = list(Item.objects.filter(empresa=empresa).only('id', 'valor_unitario'))
+
+    hoje = timezone.localdate()
+    inicio = hoje - timedelta(days=365 * anos)
+    dias = (hoje - inicio).days + 180
+    linhas_por_orcamento = []
+    novos = []
+    for _ in range(orcamentos):
+        data_evento = inicio + timedelta(days=rnd.randrange(dias))
+        status = _status(data_evento, hoje, rnd)
+        linhas = []
+        for item in rnd.sample(catalogo, min(len(catalogo), rnd.randint(1, itens_por_orcamento))):
+            desconto = Decimal(rnd.choice((0, 0, 0, 5, 10)))
+            linhas.append(OrcamentoItem(item_id=item.pk, quantidade=rnd.randint(1, 3),
+                                        valor=item.valor_unitario, desconto=desconto))
+        subtotal = sum(
+            (calcular_valor_linha(linha.valor, linha.quantidade, linha.desconto) for linha in linhas), Decimal('0')
+        ).quantize(CENTAVOS)
+
+        orcamento = Orcamento(
+            empresa=empresa,
+            criado_por=usuario,
+            cliente_id=rnd.choice(id_clientes),
+            data_evento=data_evento,
+            hora_evento=hora(rnd.choice((10, 14, 15, 16, 18, 19))),
+            periodo_evento=rnd.choice('1233'),
+            desconto_geral=Decimal(rnd.choice((0, 0, 0, 5))),
+            status=status,
+            tipo_evento=rnd.choice(TIPOS_EVENTO),
+            valor_adicional=Decimal(rnd.choice((0, 0, 50, 100))),
+            endereco=f'Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 2000)} - {rnd.choice(BAIRROS)}',
+            observacoes=rnd.choice(('', '', 'Montagem uma hora antes.', 'Cliente pediu tema de super-heróis.')),
+            subtotal=subtotal,
+        )
+        orcamento.atualizar_total_e_saldo()
+        if status in ('confirmado', 'concluido', 'reagendar'):
+            orcamento.valor_pago = orcamento.total if status == 'concluido' else (orcamento.total / 2).quantize(CENTAVOS)
+            orcamento.atualizar_total_e_saldo()
+        novos.append(orcamento)
+        linhas_por_orcamento.append(linhas)
+    Orcamento.objects.bulk_create(novos, batch_size=lote)
+
+    # A empresa é nova, então a ordem dos ids é a ordem de criação
+    id_orcamentos = Orcamento.objects.filter(empresa=empresa).order_by('id').values_list('id', flat=True)
+    todas = []
+    for orcamento_id, linhas in zip(id_orcamentos, linhas_por_orcamento):
+        for linha in linhas:
+            linha.orcamento_id = orcamento_id
+            todas.append(linha)
+    OrcamentoItem.objects.bulk_create(todas, batch_size=lote)
+
+    ResumoMensal.reconstruir(empresa_id=empresa.pk)
+    reconstruir_indice(empresa_id=empresa.pk)
+    return empresa, len(todas)
+
+
+def semear(empresas=3, clientes=200, itens=60, orcamentos=2000, itens_por_orcamento=6, anos=3,
+           semente=42, lote=500, progresso=None):
+    """Cria `empresas` empresas de teste com os volumes pedidos (por empresa). Determinístico pela semente"""
+    rnd = random.Random(semente)
+    inicio = Empresa.objects.filter(nome__startswith=PREFIXO_EMPRESA).count() + 1
+    resultado = {'empresas': [], 'clientes': 0, 'itens': 0, 'orcamentos': 0, 'linhas': 0}
+    for indice in range(inicio, inicio + empresas):
+        with transaction.atomic():
+            empresa, linhas = _criar_empresa(indice, clientes, itens, orcamentos, itens_por_orcamento, anos, rnd, lote)
+        resultado['empresas'].append(empresa.pk)
+        resultado['clientes'] += clientes
+        resultado['itens'] += itens
+        resultado['orcamentos'] += orcamentos
+        resultado['linhas'] += linhas
+        if progresso:
+            progresso(empresa)
+    return resultado
+
+
+def apagar_dados_bench():
+    """Remove as empresas de teste (e, em cascata, tudo que pertence a elas)"""
+    empresas = Empresa.objects.filter(nome__startswith=PREFIXO_EMPRESA)
+    # Orçamentos antes das empresas: os signals refazem o resumo mensal enquanto a empresa ainda existe
+    apagados = Orcamento.objects.filter(empresa__in=empresas).delete()[0]
+    return apagados + empresas.delete()[0]
+
+
+def empresa_bench(empresa_id=None):
+    """Empresa de teste usada pelo benchmark: a pedida ou a que tem mais orçamentos"""
+    empresas = Empresa.objects.filter(nome__startswith=PREFIXO_EMPRESA)
+    if empresa_id:
+        return empresas.filter(pk=empresa_id).first()
+    return empresas.annotate(quantidade=Count('orcamentos')).order_by('-quantidade', 'id').first()
+
+
+def _percentil(valores, fracao):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def _cenarios_http(empresa):
+    orcamento = (
+        Orcamento.objects.filter(empresa=empresa, itens__isnull=False).order_by('id').distinct().first()
+    )
+    return {
+        'lista_orcamentos': reverse('orcamentos:lista_orcamentos'),
+        'detalhes_orcamento': reverse('orcamentos:detalhes_orcamento', args=[orcamento.pk]),
+        'agendamentos': reverse('orcamentos:agendamentos'),
+        'dashboard_relatorios': reverse('relatorios:dashboard'),
+        'lista_itens': reverse('orcamentos:lista_itens'),
+        'baixar_pdf': reverse('orcamentos:baixar_pdf', args=[orcamento.pk]),
+    }, orcamento
+
+
+def _cenarios_render(orcamento, pasta):
+    from .utils import gerar_imagem, renderizar_documento
+
+    ctx = RenderContext.da_empresa(orcamento.empresa)
+    dados = orcamento_para_dict(orcamento)
+    return {
+        'render_pdf': lambda: renderizar_documento(dict(dados, status='pendente'), ctx),
+        'render_confirmacao': lambda: renderizar_documento(dict(dados, status='confirmado'), ctx),
+        'render_png': lambda: gerar_imagem(dados, os.path.join(pasta, 'bench.png'), ctx=ctx),
+    }
+
+
+def _medir(funcao, repeticoes, aquecimento):
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    consultas = 0
+    for _ in range(repeticoes):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = max(consultas, len(capturadas))
+    return {
+        'consultas': consultas,
+        'p50_ms': round(statistics.median(tempos), 2),
+        'p95_ms': round(_percentil(tempos, 0.95), 2),
+        'repeticoes': repeticoes,
+    }
+
+
+def medir(empresa, repeticoes=20, aquecimento=2, cenarios=None):
+    """Roda os cenários (rotas e renders) contra a empresa e devolve o resultado no formato do baseline"""
+    usuario = Usuario.objects.filter(empresa=empresa).order_by('id').first()
+    cliente = Client()
+    cliente.force_login(usuario)
+    rotas, orcamento = _cenarios_http(empresa)
+
+    def requisitar(url):
+        resposta = cliente.get(url)
+        if resposta.status_code != 200:
+            raise RuntimeError(f'{url} respondeu {resposta.status_code}')
+        # Respostas de arquivo só são lidas quando consumidas
+        b''.join(resposta.streaming_content) if resposta.streaming else resposta.content
+
+    resultados = {}
+    # Downloads síncronos (sem a fila) e o host do cliente de teste liberado
+    with override_settings(ALLOWED_HOSTS=['*'], DOCUMENTOS_FILA=False), tempfile.TemporaryDirectory() as pasta:
+        funcoes = {nome: (lambda url=url: requisitar(url)) for nome, url in rotas.items()}
+        funcoes.update(_cenarios_render(orcamento, pasta))
+        for nome, funcao in funcoes.items():
+            if cenarios and nome not in cenarios:
+                continue
+            resultados[nome] = _medir(funcao, repeticoes, aquecimento)
+
+    return {
+        'gerado_em': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'banco': connection.vendor,
+        'escala': {
+            'clientes': Cliente.objects.filter(empresa=empresa).count(),
+            'itens': Item.objects.filter(empresa=empresa).count(),
+            'orcamentos': Orcamento.objects.filter(empresa=empresa).count(),
+        },
+        'cenarios': resultados,
+    }
+
+
+def comparar(atual, baseline, limite=0.25):
+    """
+    Regressões do resultado atual frente ao baseline: p50 mais de `limite`
+    (fração) acima do gravado, ou qualquer consulta SQL a mais
+    """
+    regressoes = []
+    for nome, medida in atual['cenarios'].items():
+        anterior = baseline.get('cenarios', {}).get(nome)
+        if anterior is None:
+            continue
+        if medida['consultas'] > anterior['consultas']:
+            regressoes.append(f"{nome}: {anterior['consultas']} -> {medida['consultas']} consultas")
+        if medida['p50_ms'] > anterior['p50_ms'] * (1 + limite):
+            regressoes.append(
+                f"{nome}: p50 {anterior['p50_ms']} -> {medida['p50_ms']} ms "
+                f"(+{(medida['p50_ms'] / anterior['p50_ms'] - 1) * 100:.0f}%)"
+            )
+    return regressoes
@@ -0,0 +1,138 @@
+"""
+Busca full-text da lista de orçamentos.
+
+Cada orçamento tem uma linha em IndiceBusca com o nome e o telefone do cliente,
+as observações e os nomes/descrições dos itens, atualizada pelos signals quando
+qualquer uma dessas fontes muda. Sobre essa tabela:
+
+- SQLite: tabela FTS5 orcamentos_busca_fts (sem acento, sem caixa), sincronizada
+  por triggers e ordenada por bm25 com peso maior para o nome do cliente
+- MySQL: índice FULLTEXT em modo booleano, ordenado pelo score do MATCH
+- outros bancos: icontains nas colunas do índice, sem ordem de relevância
+
+Todos os termos precisam aparecer e cada um casa como prefixo ("ana sil" acha
+"Ana Silva").
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import IndiceBusca, Orcamento
+from .transacoes import ao_confirmar
+
+TABELA_FTS = 'orcamentos_busca_fts'
+# Pesos do bm25 por coluna: cliente, telefone, observacoes, itens
+PESOS_FTS = (10.0, 5.0, 1.0, 2.0)
+LOTE = 500
+
+
+def termos_busca(texto):
+    """Palavras da busca, sem pontuação (que as sintaxes de FTS5 e MySQL interpretariam)"""
+    return re.findall(r'\w+', texto.lower())
+
+
+def _linha_indice(orcamento):
+    telefone = orcamento.cliente.telefone or ''
+    return IndiceBusca(
+        orcamento_id=orcamento.pk,
+        cliente=orcamento.cliente.nome,
+        # Só os dígitos também, para achar "11912345678" digitado sem máscara
+        telefone=f"{telefone} {re.sub(r'[^0-9]', '', telefone)}".strip(),
+        observacoes=orcamento.observacoes or '',
+        itens=' '.join(f"{linha.item.nome or ''} {linha.item.descricao}" for linha in orcamento.itens.all()),
+    )
+
+
+def indexar_orcamentos(ids):
+    """Refaz as linhas do índice dos orçamentos informados"""
+    ids = list(ids)
+    for inicio in range(0, len(ids), LOTE):
+        lote = ids[inicio:inicio + LOTE]
+        orcamentos = Orcamento.objects.filter(pk__in=lote).select_related('cliente').prefetch_related('itens__item')
+        with transaction.atomic():
+            IndiceBusca.objects.filter(pk__in=lote).delete()
+            IndiceBusca.objects.bulk_create(_linha_indice(orcamento) for orcamento in orcamentos)
+
+
+def agendar_indexacao(ids):
+    """
+    Reindexa os orçamentos no commit da transação atual, uma vez por orçamento
+    por mais linhas que tenham mudado nela (usado pelos signals)
+    """
+    ao_confirmar('indice_busca', ids, indexar_orcamentos)
+
+
+def reconstruir_indice(empresa_id=None):
+    """Reindexa todos os orçamentos (ou os de uma empresa). Devolve quantos foram indexados"""
+    orcamentos = Orcamento.objects.order_by('pk')
+    if empresa_id:
+        orcamentos = orcamentos.filter(empresa_id=empresa_id)
+    ids = list(orcamentos.values_list('pk', flat=True))
+    indexar_orcamentos(ids)
+    return len(ids)
+
+
+def _fts_sqlite():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABELA_FTS])
+        return cursor.fetchone() is not None
+
+
+def buscar(orcamentos, texto, ranquear=True):
+    """
+    Filtra o queryset de orçamentos pela busca. Com `ranquear`, anota também
+    `relevancia` (maior é melhor); sem ela a busca vira um simples `id IN (...)`,
+    que combina com agregações e outras ordenações.
+    """
+    termos = termos_busca(texto)
+    sem_relevancia = Value(0.0, output_field=FloatField())
+    if not termos:
+        return orcamentos.annotate(relevancia=sem_relevancia) if ranquear else orcamentos
+    tabela = Orcamento._meta.db_table
+
+    if connection.vendor == 'sqlite' and _fts_sqlite():
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        if not ranquear:
+            return orcamentos.filter(
+                pk__in=RawSQL(f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', (consulta,))
+            )
+        # extra(): a tabela FTS entra no FROM e a relevância sai do mesmo MATCH,
+        # em vez de reavaliar a busca numa subconsulta para cada linha
+        pesos = ', '.join(str(peso) for peso in PESOS_FTS)
+        return orcamentos.extra(
+            tables=[TABELA_FTS],
+            # O + impede o SQLite de consultar o FTS por rowid para cada orçamento (refazendo o MATCH
+            # a cada linha): a busca roda uma vez e os orçamentos são lidos pela chave primária
+            where=[f'"{tabela}"."id" = +{TABELA_FTS}.rowid', f'{TABELA_FTS} MATCH %s'],
+            params=[consulta],
+            # bm25 é negativo e menor para os melhores resultados
+            select={'relevancia': f'-bm25({TABELA_FTS}, {pesos})'},
+        )
+
+    if connection.vendor == 'mysql':
+        consulta = ' '.join(f'+{termo}*' for termo in termos)
+        indice = IndiceBusca._meta.db_table
+        match = f'MATCH({indice}.cliente, {indice}.telefone, {indice}.observacoes, {indice}.itens) ' \
+                'AGAINST (%s IN BOOLEAN MODE)'
+        if not ranquear:
+            return orcamentos.filter(
+                pk__in=RawSQL(f'SELECT orcamento_id FROM {indice} WHERE {match}', (consulta,))
+            )
+        return orcamentos.extra(
+            tables=[indice],
+            where=[f'{indice}.orcamento_id = `{tabela}`.`id`', match],
+            params=[consulta],
+            select={'relevancia': match},
+            select_params=[consulta],
+        )
+
+    for termo in termos:
+        orcamentos = orcamentos.filter(
+            Q(indice_busca__cliente__icontains=termo) |
+            Q(indice_busca__telefone__icontains=termo) |
+            Q(indice_busca__observacoes__icontains=termo) |
+            Q(indice_busca__itens__icontains=termo)
+        )
+    return orcamentos.annotate(relevancia=sem_relevancia) if ranquear else orcamentos
@@ -0,0 +1,33 @@
+from django.core.checks import Warning, register
+
+
+@register()
+def verificar_fontes(app_configs, **kwargs):
+    """Avisa na inicialização quando os PNGs vão cair na fonte bitmap padrão"""
+    # Importado aqui para não carregar o Pillow junto com o app
+    from .fontes import FONTES, fontes_ausentes
+
+    return [
+        Warning(
+            f"Nenhuma fonte TTF encontrada para {familia}/{peso} (candidatas: {', '.join(FONTES[(familia, peso)])}).",
+            hint="Instale as fontes DejaVu ou aponte FONTES_DIR para uma pasta com os arquivos .ttf.",
+            id='orcamentos.W001',
+        )
+        for familia, peso in fontes_ausentes()
+    ]
+
+
+@register()
+def verificar_rasterizacao(app_configs, **kwargs):
+    """Avisa na inicialização quando o download do orçamento em imagem não vai funcionar"""
+    from .documentos import rasterizacao_disponivel
+
+    if rasterizacao_disponivel():
+        return []
+    return [
+        Warning(
+            "pdf2image ou o poppler (pdftoppm) não estão disponíveis: o orçamento em imagem ficará indisponível.",
+            hint="pip install pdf2image e instale o poppler (apt install poppler-utils).",
+            id='orcamentos.W002',
+        )
+    ]
@@ -0,0 +1,164 @@
+"""
+Dados dos documentos e identidade visual usada nos renders.
+
+Não importa nada da pilha de render (ReportLab/Pillow): views, cache e
+exportação usam este módulo para montar os dados e a chave do documento sem
+pagar o custo de carregar as bibliotecas de PDF/imagem.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime, time
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from django.utils import timezone
+
+
+BRAND = {
+    "empresa": "Mundo Kids",
+    "slogan": "Diversão para sua festa!",
+    "segmento": "Locação de brinquedos para festas e eventos",
+    "cidade": "Cajazeiras-PB e região",
+    "instagram": "@mundokidscz",
+    "whatsapp": "+55 83 9 8149-3235",
+}
+
+COLORS = {
+    "primary": "#2463EB",
+    "secondary": "#4ECDC4",
+    "accent": "#FF6B6B",
+    "light": "#F8FAFC",
+    "dark": "#1E293B",
+    "muted": "#64748B",
+    "success": "#10B981",
+    "gradient_start": "#667EEA",
+    "gradient_end": "#764BA2"
+}
+
+LOGO_PATH = os.environ.get("MUNDOKIDS_LOGO", "MUNDOKIDS_LOGO.png")
+
+
+@dataclass(frozen=True)
+class RenderContext:
+    """
+    Marca, cores e logo usados em um render. Imutável e sem estado global,
+    pode ser compartilhado entre threads e enviado (pickle) para outros processos.
+    BRAND/COLORS/LOGO_PATH acima são apenas os valores padrão.
+    """
+    brand: Mapping[str, str]
+    colors: Mapping[str, str]
+    logo_path: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "brand", MappingProxyType(dict(self.brand)))
+        object.__setattr__(self, "colors", MappingProxyType(dict(self.colors)))
+
+    def __reduce__(self):
+        return (RenderContext, (dict(self.brand), dict(self.colors), self.logo_path))
+
+    @classmethod
+    def da_empresa(cls, empresa) -> "RenderContext":
+        """Contexto com a identidade visual da empresa, caindo nos padrões quando faltar algo"""
+        logo_path = LOGO_PATH
+        if getattr(empresa, "logo", None):
+            try:
+                # Para ImageField, use .path para obter o caminho absoluto
+                logo_path = empresa.logo.path
+            except (ValueError, AttributeError, NotImplementedError):
+                pass
+
+        colors = dict(COLORS)
+        colors["primary"] = getattr(empresa, "cor_principal", None) or COLORS["primary"]
+        colors["secondary"] = getattr(empresa, "cor_secundaria", None) or COLORS["secondary"]
+        colors["accent"] = getattr(empresa, "cor_acento", None) or COLORS["accent"]
+
+        brand = dict(BRAND)
+        brand["empresa"] = getattr(empresa, "nome", BRAND["empresa"])
+        brand["cidade"] = getattr(empresa, "cidade", BRAND["cidade"])
+        brand["instagram"] = getattr(empresa, "instagram", BRAND["instagram"])
+        brand["whatsapp"] = getattr(empresa, "whatsapp", BRAND["whatsapp"])
+
+        return cls(brand=brand, colors=colors, logo_path=logo_path)
+
+
+CONTEXTO_PADRAO = RenderContext(brand=BRAND, colors=COLORS, logo_path=LOGO_PATH)
+
+
+def data_emissao(dados: Dict[str, Any]) -> datetime:
+    """Data de emissão do documento: vem nos dados (render determinístico) ou hoje"""
+    try:
+        return datetime.strptime(dados["data_emissao"], "%d/%m/%Y")
+    except (KeyError, TypeError, ValueError):
+        return datetime.now()
+
+
+def orcamento_para_dict(orcamento):
+    """Converte um objeto Orcamento para o formato esperado pelo template"""
+    #diminuindo uma hora do horário do evento para a montagem
+    hora_montagem = getattr(orcamento, 'hora_evento', None) or '16:00'
+    if isinstance(hora_montagem, time):
+        hora_montagem = hora_montagem.strftime("%H:%M")  # converte para string
+
+    hora_montagem_parts = hora_montagem.split(':')
+    if len(hora_montagem_parts) == 2:
+        hora_montagem_hour = int(hora_montagem_parts[0]) - 1
+        if hora_montagem_hour < 0:
+            hora_montagem_hour = 0
+        hora_montagem = f"{hora_montagem_hour:02}:{hora_montagem_parts[1]}"
+
+    periodo_evento = getattr(orcamento, 'periodo_evento', 3)  # em horas
+    periodo_evento = int(periodo_evento) if isinstance(periodo_evento, int) else 3
+
+    hora_desmontagem_parts = hora_montagem.split(':')
+    if len(hora_desmontagem_parts) == 2:
+        hora_desmontagem_hour = int(hora_desmontagem_parts[0]) + periodo_evento + 1  # +1 hora para desmontagem
+        if hora_desmontagem_hour > 23:
+            hora_desmontagem_hour = 23
+        hora_desmontagem = f"{hora_desmontagem_hour:02}:{hora_desmontagem_parts[1]}"
+    # Obter dados do evento (você precisa adicionar esses campos ao modelo)
+    evento_data = {
+        "tipo": getattr(orcamento, 'tipo_evento', 'Aniversário Infantil'),
+        "endereco": getattr(orcamento, 'endereco', 'Endereço não definido'),
+        "data": orcamento.data_evento.strftime("%d/%m/%Y") if orcamento.data_evento else "Data não definida",
+        "hora_inicio": getattr(orcamento, 'hora_evento', '16:00'),
+        "hora_montagem": hora_montagem,
+        "hora_desmontagem": hora_desmontagem,
+    }
+    
+    # Converter itens para o formato esperado
+    brinquedos = []
+    total = Decimal('0.0')
+    for item in orcamento.itens.all():
+        valor_unitario = float(item.valor) if isinstance(item.valor, Decimal) else float(item.valor or 0)
+        desconto = float(item.desconto) if isinstance(item.desconto, Decimal) else float(item.desconto or 0)
+        
+        valor_item = item.quantidade * valor_unitario * (1 - desconto / 100.0)
+        total += Decimal(str(valor_item))
+        brinquedos.append({
+            "descricao": item.item.nome if item.item.nome else item.item.descricao,
+            "quantidade": item.quantidade,
+            "periodo": getattr(item.item, 'periodo', '3 horas'),  # Adicione campo periodo ao modelo Item
+            "valor_unitario": float(item.valor),
+            "desconto": float(item.desconto),
+        })
+    
+    desconto_geral = float(orcamento.desconto_geral) if isinstance(orcamento.desconto_geral, Decimal) else float(orcamento.desconto_geral or 0)
+    total = float(total - (total * Decimal(desconto_geral) / Decimal('100.0')))
+        
+    return {
+        "cliente": {
+            "nome": orcamento.cliente.nome,
+            "telefone": orcamento.cliente.telefone,
+        },
+        "status": orcamento.status,
+        'valor_adicional': float(orcamento.valor_adicional) if isinstance(orcamento.valor_adicional, Decimal) else float(orcamento.valor_adicional or 0),
+        "valor_total": total,
+        "valor_pago": float(orcamento.valor_pago) if isinstance(orcamento.valor_pago, Decimal) else float(orcamento.valor_pago or 0),
+        "desconto_geral": desconto_geral,
+        "observacoes": orcamento.observacoes or "",
+        "data_criacao": orcamento.data_criacao.strftime("%d/%m/%Y"),
+        "data_emissao": timezone.localdate().strftime("%d/%m/%Y"),
+        "evento": evento_data,
+        "brinquedos": brinquedos
+    }
@@ -0,0 +1,393 @@
+"""
+Cache dos PDFs gerados para os orçamentos.
+
+Cada documento é identificado por uma chave derivada de tudo que influencia o
+render (dados do orçamento, identidade visual da empresa, hash da logo e versão
+do layout). Downloads repetidos reaproveitam o arquivo já gerado; qualquer
+mudança no orçamento, nos itens ou na empresa gera uma chave nova e o arquivo
+anterior do mesmo orçamento é descartado.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.utils import timezone
+
+from .armazenamento import storage_documentos
+from .models import ArquivoDescartado, DocumentoGerado, ImagemDocumento, Orcamento, TarefaDocumento
+from .contexto import RenderContext, orcamento_para_dict
+
+# Incrementar sempre que o layout dos documentos mudar em utils.py
+VERSAO_LAYOUT = 2
+
+_hashes_logo = {}
+
+
+def hash_arquivo(caminho):
+    """sha256 do arquivo, memorizado por (caminho, mtime, tamanho)"""
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return ''
+    assinatura = (caminho, stat.st_mtime_ns, stat.st_size)
+    if assinatura not in _hashes_logo:
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(65536), b''):
+                sha.update(bloco)
+        if len(_hashes_logo) > 256:
+            _hashes_logo.clear()
+        _hashes_logo[assinatura] = sha.hexdigest()
+    return _hashes_logo[assinatura]
+
+
+def chave_documento(orcamento, dados=None, ctx=None):
+    """
+    Chave de cache do PDF do orçamento. A data de emissão fica de fora: o arquivo
+    guarda a data do primeiro render daquele conteúdo, em vez de virar outra
+    chave (e outro render) a cada dia
+    """
+    ctx = ctx or RenderContext.da_empresa(orcamento.empresa)
+    dados = dados if dados is not None else orcamento_para_dict(orcamento)
+    entradas = {
+        'versao': VERSAO_LAYOUT,
+        'dados': {campo: valor for campo, valor in dados.items() if campo != 'data_emissao'},
+        'marca': dict(ctx.brand),
+        'cores': dict(ctx.colors),
+        'logo': hash_arquivo(ctx.logo_path),
+    }
+    serializado = json.dumps(entradas, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def _arquivo_existe(documento):
+    return bool(documento.arquivo) and documento.arquivo.storage.exists(documento.arquivo.name)
+
+
+def documento_pronto(orcamento):
+    """DocumentoGerado da chave atual do orçamento, sem renderizar (ou None)"""
+    documento = DocumentoGerado.objects.filter(chave=chave_documento(orcamento)).first()
+    if documento is None or not _arquivo_existe(documento):
+        return None
+    return documento
+
+
+def cache_ativo():
+    return getattr(settings, 'DOCUMENTOS_CACHE', True)
+
+
+def renderizar_pdf(orcamento, ctx=None, dados=None):
+    """Bytes do PDF atual do orçamento, renderizado em memória (sem tocar no disco)"""
+    # A pilha de render (ReportLab/Pillow) só é carregada no primeiro documento
+    from .utils import renderizar_documento
+
+    ctx = ctx or RenderContext.da_empresa(orcamento.empresa)
+    return renderizar_documento(dados if dados is not None else orcamento_para_dict(orcamento), ctx)
+
+
+def obter_pdf(orcamento):
+    """
+    Retorna o DocumentoGerado com o PDF atual do orçamento, renderizando apenas
+    quando não há arquivo para a chave atual. O arquivo é gravado pelo storage
+    de documentos (settings.DOCUMENTOS_STORAGE).
+    """
+    ctx = RenderContext.da_empresa(orcamento.empresa)
+    dados = orcamento_para_dict(orcamento)
+    chave = chave_documento(orcamento, dados=dados, ctx=ctx)
+    documento = DocumentoGerado.objects.filter(chave=chave).first()
+
+    if documento is None or not _arquivo_existe(documento):
+        pdf = renderizar_pdf(orcamento, ctx=ctx, dados=dados)
+        nome = storage_documentos().save(f"orcamentos/cache/{chave}.pdf", ContentFile(pdf))
+
+        documento, _ = DocumentoGerado.objects.update_or_create(
+            chave=chave,
+            defaults={
+                'orcamento': orcamento,
+                'arquivo': nome,
+                'tamanho': len(pdf),
+            },
+        )
+        descartar_substituidos(orcamento, manter=documento)
+    else:
+        DocumentoGerado.objects.filter(pk=documento.pk).update(acessado_em=timezone.now())
+
+    if orcamento.pdf.name != documento.arquivo.name:
+        orcamento.pdf = documento.arquivo.name
+        orcamento.save(update_fields=['pdf'])
+    return documento
+
+
+def abrir_pdf(orcamento):
+    """
+    Arquivo binário com o PDF atual do orçamento, pronto para um FileResponse.
+    Com o cache desligado (DOCUMENTOS_CACHE=False) o download não grava nada.
+    """
+    if cache_ativo():
+        return obter_pdf(orcamento).arquivo.open('rb')
+    return io.BytesIO(renderizar_pdf(orcamento))
+
+
+def descartar_substituidos(orcamento, manter):
+    """Remove os documentos anteriores do orçamento (chaves que não valem mais)"""
+    # Os arquivos vão para a fila de descarte pelo signal post_delete de DocumentoGerado
+    DocumentoGerado.objects.filter(orcamento=orcamento).exclude(pk=manter.pk).delete()
+
+
+def descartar_arquivos(*nomes):
+    """Agenda a remoção dos arquivos no storage; nada é apagado dentro da requisição"""
+    ArquivoDescartado.objects.bulk_create(ArquivoDescartado(nome=nome) for nome in nomes if nome)
+
+
+def descartar_documentos_orcamento(orcamento):
+    """Descarta o PDF/PNG salvos no orçamento e limpa os campos (sem salvar)"""
+    descartar_arquivos(orcamento.pdf.name, orcamento.png.name)
+    orcamento.pdf = None
+    orcamento.png = None
+
+
+def limpar_arquivos_descartados(lote=200):
+    """
+    Apaga do storage, em lotes, os arquivos descartados que nenhum registro
+    referencia mais (com o storage deduplicado o mesmo arquivo pode servir a
+    vários documentos). Retorna quantos arquivos foram apagados.
+    """
+    storage = storage_documentos()
+    apagados = 0
+    while True:
+        descartados = list(ArquivoDescartado.objects.order_by('pk')[:lote])
+        if not descartados:
+            return apagados
+
+        nomes = {descartado.nome for descartado in descartados}
+        for nome in nomes - _referenciados(nomes):
+            if storage.exists(nome):
+                storage.delete(nome)
+                apagados += 1
+        ArquivoDescartado.objects.filter(pk__in=[descartado.pk for descartado in descartados]).delete()
+
+
+# Imagens para compartilhamento: rasterização do PDF em cache
+
+FORMATOS_IMAGEM = {
+    'png': ('PNG', 'image/png', {'optimize': True}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True}),
+    'webp': ('WEBP', 'image/webp', {'quality': 85}),
+}
+DPI_MINIMO = 72
+DPI_MAXIMO = 300
+
+
+def dpi_imagem(dpi=None):
+    """DPI pedido, limitado à faixa aceita; sem pedido usa settings.DOCUMENTOS_IMAGEM_DPI"""
+    padrao = getattr(settings, 'DOCUMENTOS_IMAGEM_DPI', 150)
+    try:
+        dpi = int(dpi) if dpi else padrao
+    except (TypeError, ValueError):
+        dpi = padrao
+    return max(DPI_MINIMO, min(DPI_MAXIMO, dpi))
+
+
+def rasterizacao_disponivel():
+    """pdf2image instalado e o pdftoppm do poppler no PATH, sem os quais não há imagens"""
+    try:
+        import pdf2image  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which('pdftoppm') is not None
+
+
+def rasterizar_pagina(pdf, pagina, dpi):
+    """Imagem PIL de uma página do PDF (pdf2image/poppler), ou None se a página não existe"""
+    from pdf2image import convert_from_bytes
+
+    paginas = convert_from_bytes(pdf, dpi=dpi, first_page=pagina, last_page=pagina)
+    return paginas[0] if paginas else None
+
+
+def obter_imagem(orcamento, pagina=1, dpi=None, formato='png'):
+    """
+    ImagemDocumento com a página do PDF atual do orçamento em PNG/JPEG/WebP.
+    Reaproveita o PDF do cache e cada (página, dpi, formato) é rasterizado uma
+    única vez por documento. Retorna None se a página não existe.
+    """
+    formato = formato if formato in FORMATOS_IMAGEM else 'png'
+    dpi = dpi_imagem(dpi)
+    documento = obter_pdf(orcamento)
+    imagem = documento.imagens.filter(pagina=pagina, dpi=dpi, formato=formato).first()
+    if imagem is not None and _arquivo_existe(imagem):
+        return imagem
+
+    with documento.arquivo.open('rb') as arquivo:
+        raster = rasterizar_pagina(arquivo.read(), pagina, dpi)
+    if raster is None:
+        return None
+
+    formato_pil, _, opcoes = FORMATOS_IMAGEM[formato]
+    if formato_pil == 'JPEG':
+        raster = raster.convert('RGB')
+    buffer = io.BytesIO()
+    raster.save(buffer, formato_pil, **opcoes)
+    conteudo = buffer.getvalue()
+
+    nome = storage_documentos().save(
+        f"orcamentos/imagens/{documento.chave}_p{pagina}_{dpi}.{formato}", ContentFile(conteudo)
+    )
+    imagem, _ = ImagemDocumento.objects.update_or_create(
+        documento=documento, pagina=pagina, dpi=dpi, formato=formato,
+        defaults={'arquivo': nome, 'tamanho': len(conteudo)},
+    )
+    return imagem
+
+
+# Coleta de arquivos órfãos
+
+# Pastas do storage com arquivos gerados a partir dos orçamentos
+PASTAS_DOCUMENTOS = ('orcamentos/cache', 'orcamentos/gerados', 'orcamentos/imagens', 'orcamentos/pdf', 'orcamentos/png')
+
+
+def percorrer_arquivos(storage, pasta):
+    """Nomes dos arquivos sob a pasta, em ordem, listando um diretório de cada vez"""
+    try:
+        diretorios, arquivos = storage.listdir(pasta)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for arquivo in sorted(arquivos):
+        yield f"{pasta}/{arquivo}"
+    for diretorio in sorted(diretorios):
+        yield from percorrer_arquivos(storage, f"{pasta}/{diretorio}")
+
+
+def _referenciados(nomes):
+    em_uso = set(DocumentoGerado.objects.filter(arquivo__in=nomes).values_list('arquivo', flat=True))
+    em_uso.update(ImagemDocumento.objects.filter(arquivo__in=nomes).values_list('arquivo', flat=True))
+    em_uso.update(Orcamento.objects.filter(pdf__in=nomes).values_list('pdf', flat=True))
+    em_uso.update(Orcamento.objects.filter(png__in=nomes).values_list('png', flat=True))
+    return em_uso
+
+
+def coletar_orfaos(dias=7, lote=500, limite=0, simular=False):
+    """
+    Apaga os arquivos das PASTAS_DOCUMENTOS que nenhum orçamento nem o índice do
+    cache referencia e que são mais antigos que `dias`. As pastas são lidas aos
+    poucos e as referências conferidas em lotes, então a memória não depende do
+    tamanho do diretório. `limite` (0 = sem limite) encerra a execução depois de
+    tantos arquivos apagados; a próxima continua de onde os órfãos sobraram.
+    """
+    storage = storage_documentos()
+    corte = timezone.now() - timedelta(days=dias)
+    resultado = {'verificados': 0, 'apagados': 0, 'bytes': 0}
+
+    def processar(nomes):
+        em_uso = _referenciados(nomes)
+        for nome in nomes:
+            if nome in em_uso:
+                continue
+            try:
+                if storage.get_modified_time(nome) > corte:
+                    continue
+                tamanho = storage.size(nome)
+                if not simular:
+                    storage.delete(nome)
+            except FileNotFoundError:
+                continue
+            resultado['apagados'] += 1
+            resultado['bytes'] += tamanho
+            if limite and resultado['apagados'] >= limite:
+                return False
+        return True
+
+    for pasta in PASTAS_DOCUMENTOS:
+        nomes = []
+        for nome in percorrer_arquivos(storage, pasta):
+            resultado['verificados'] += 1
+            nomes.append(nome)
+            if len(nomes) >= lote:
+                if not processar(nomes):
+                    return resultado
+                nomes = []
+        if nomes and not processar(nomes):
+            return resultado
+    return resultado
+
+
+# Fila de renderização em segundo plano
+
+def fila_ativa():
+    return getattr(settings, 'DOCUMENTOS_FILA', False)
+
+
+def enfileirar_documento(orcamento):
+    """
+    Agenda a pré-renderização do documento do orçamento. Uma única tarefa
+    pendente por orçamento basta: o worker sempre usa o estado atual.
+    """
+    if not fila_ativa():
+        return None
+    tarefa = TarefaDocumento.objects.filter(orcamento=orcamento, status='pendente').first()
+    if tarefa is None:
+        tarefa = TarefaDocumento.objects.create(orcamento=orcamento)
+    return tarefa
+
+
+def status_documento(orcamento):
+    """'pronto', 'renderizando' ou 'erro' para o documento atual do orçamento"""
+    if documento_pronto(orcamento):
+        return 'pronto'
+    ultima = TarefaDocumento.objects.filter(orcamento=orcamento).order_by('-criada_em').first()
+    if ultima is not None and ultima.status == 'erro':
+        return 'erro'
+    return 'renderizando'
+
+
+def _reservar_proxima_tarefa():
+    """Reserva uma tarefa pendente; o UPDATE condicional evita que dois workers peguem a mesma"""
+    while True:
+        tarefa = TarefaDocumento.objects.filter(status='pendente').order_by('criada_em').first()
+        if tarefa is None:
+            return None
+        reservada = TarefaDocumento.objects.filter(pk=tarefa.pk, status='pendente').update(
+            status='processando',
+            tentativas=F('tentativas') + 1,
+            atualizada_em=timezone.now(),
+        )
+        if reservada:
+            tarefa.refresh_from_db()
+            return tarefa
+
+
+def liberar_tarefas_presas(minutos=10):
+    """Devolve à fila tarefas 'processando' de workers que morreram no meio do render"""
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TarefaDocumento.objects.filter(status='processando', atualizada_em__lt=limite).update(status='pendente')
+
+
+def processar_proxima_tarefa():
+    """Renderiza o documento da próxima tarefa da fila. Retorna a tarefa ou None se a fila estiver vazia"""
+    tarefa = _reservar_proxima_tarefa()
+    if tarefa is None:
+        return None
+
+    max_tentativas = getattr(settings, 'DOCUMENTOS_FILA_MAX_TENTATIVAS', 3)
+    try:
+        orcamento = (
+            Orcamento.objects
+            .select_related('cliente', 'empresa')
+            .prefetch_related('itens__item')
+            .get(pk=tarefa.orcamento_id)
+        )
+        obter_pdf(orcamento)
+    except Exception as e:
+        tarefa.erro = str(e)
+        tarefa.status = 'pendente' if tarefa.tentativas < max_tentativas else 'erro'
+    else:
+        tarefa.erro = ''
+        tarefa.status = 'concluida'
+    tarefa.save(update_fields=['status', 'erro', 'atualizada_em'])
+    return tarefa
@@ -0,0 +1,144 @@
+"""
+Exportação em lote dos documentos dos orçamentos.
+
+Pelo comando exportar_orcamentos, os PDFs são renderizados num pool de processos
+(um por núcleo; na tela, só com EXPORTACAO_PROCESSOS_WEB > 1) a partir dos
+dicionários de orcamento_para_dict e do RenderContext da empresa, que são
+serializáveis. Documentos que já estão no cache são lidos do disco em vez de
+renderizados. O resultado sai como um ZIP transmitido entrada por entrada ou
+como um único PDF juntado com pikepdf.
+"""
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from .contexto import RenderContext, orcamento_para_dict
+from .documentos import chave_documento
+from .models import DocumentoGerado, Orcamento
+
+FORMATOS = ('zip', 'pdf')
+
+
+def orcamentos_para_exportar(empresa=None, inicio=None, fim=None, status=None):
+    """Orçamentos filtrados por empresa, período do evento e status"""
+    orcamentos = Orcamento.objects.select_related('cliente', 'empresa').prefetch_related('itens__item')
+    if empresa is not None:
+        orcamentos = orcamentos.filter(empresa=empresa)
+    if inicio:
+        orcamentos = orcamentos.filter(data_evento__gte=inicio)
+    if fim:
+        orcamentos = orcamentos.filter(data_evento__lte=fim)
+    if status and status != 'all':
+        orcamentos = orcamentos.filter(status=status)
+    return orcamentos.order_by('data_evento', 'id')
+
+
+def nome_arquivo(orcamento):
+    tipo = 'confirmacao' if orcamento.status == 'confirmado' else 'orcamento'
+    return f"{orcamento.id}_{tipo}_{slugify(orcamento.cliente.nome) or 'cliente'}.pdf"
+
+
+def _processos():
+    processos = getattr(settings, 'EXPORTACAO_PROCESSOS', 0)
+    return processos or os.cpu_count() or 1
+
+
+def _ler_cache(chave):
+    documento = DocumentoGerado.objects.filter(chave=chave).first()
+    if documento is None or not documento.arquivo:
+        return None
+    try:
+        with documento.arquivo.open('rb') as arquivo:
+            return arquivo.read()
+    except OSError:
+        return None
+
+
+def _trabalhos(orcamentos):
+    """(nome, pdf em cache ou None, dados, ctx) para cada orçamento, consultando o banco aos poucos"""
+    contextos = {}
+    for orcamento in orcamentos.iterator(chunk_size=100):
+        ctx = contextos.get(orcamento.empresa_id)
+        if ctx is None:
+            ctx = contextos[orcamento.empresa_id] = RenderContext.da_empresa(orcamento.empresa)
+        dados = orcamento_para_dict(orcamento)
+        pdf = _ler_cache(chave_documento(orcamento, dados=dados, ctx=ctx))
+        yield nome_arquivo(orcamento), pdf, dados, ctx
+
+
+def renderizar_lote(orcamentos, processos=None):
+    """
+    Gera (nome, bytes do PDF) na ordem do queryset. No máximo 2 documentos por
+    processo ficam em voo, então a memória não cresce com o tamanho do lote.
+    """
+    from .utils import renderizar_documento
+
+    processos = processos or _processos()
+    trabalhos = _trabalhos(orcamentos)
+
+    if processos <= 1:
+        for nome, pdf, dados, ctx in trabalhos:
+            yield nome, pdf if pdf is not None else renderizar_documento(dados, ctx)
+        return
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        def enviar(trabalho):
+            nome, pdf, dados, ctx = trabalho
+            if pdf is not None:
+                return nome, None, pdf
+            return nome, executor.submit(renderizar_documento, dados, ctx), None
+
+        pendentes = [enviar(trabalho) for trabalho in islice(trabalhos, processos * 2)]
+        while pendentes:
+            nome, futuro, pdf = pendentes.pop(0)
+            proximo = next(trabalhos, None)
+            if proximo is not None:
+                pendentes.append(enviar(proximo))
+            yield nome, futuro.result() if futuro is not None else pdf
+
+
+class _Saida(io.RawIOBase):
+    """Arquivo só de escrita que acumula os bytes até serem entregues ao cliente"""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def esvaziar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def exportar_zip(orcamentos, processos=None):
+    """Gera os pedaços de um ZIP com um PDF por orçamento, sem montar o arquivo inteiro em memória"""
+    saida = _Saida()
+    # Sem seek o zipfile grava descritores de dados depois de cada entrada
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, pdf in renderizar_lote(orcamentos, processos):
+            arquivo_zip.writestr(nome, pdf)
+            yield saida.esvaziar()
+    yield saida.esvaziar()
+
+
+def exportar_pdf_unico(orcamentos, destino, processos=None):
+    """Junta todos os documentos num único PDF gravado em destino (caminho ou arquivo binário)"""
+    import pikepdf
+
+    juntado = pikepdf.Pdf.new()
+    for _, pdf in renderizar_lote(orcamentos, processos):
+        with pikepdf.Pdf.open(io.BytesIO(pdf)) as documento:
+            juntado.pages.extend(documento.pages)
+    juntado.save(destino)
+    return destino
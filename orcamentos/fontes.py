@@ -0,0 +1,58 @@
+"""
+Registro de fontes dos PNGs de compartilhamento (WhatsApp).
+
+Cada (família, peso) é resolvido uma vez por processo para um arquivo TTF,
+procurando primeiro em settings.FONTES_DIR e depois nos diretórios de fontes do
+sistema (busca do próprio Pillow). Cada tamanho é carregado uma única vez e
+reaproveitado entre renders. Sem nenhum TTF disponível o render cai na fonte
+bitmap padrão do Pillow; o system check orcamentos.W001 avisa quando isso acontece.
+"""
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from PIL import ImageFont
+
+# Candidatos em ordem de preferência para cada (família, peso)
+FONTES = {
+    ('sans', 'regular'): ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "Arial.ttf", "arial.ttf"),
+    ('sans', 'bold'): ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf", "Arial.ttf"),
+}
+
+
+def _caminho(nome):
+    """Caminho em settings.FONTES_DIR quando o arquivo existe lá; senão o nome, resolvido pelo Pillow"""
+    diretorio = getattr(settings, 'FONTES_DIR', '') if settings.configured else ''
+    caminho = os.path.join(diretorio, nome) if diretorio else ''
+    return caminho if caminho and os.path.exists(caminho) else nome
+
+
+@lru_cache(maxsize=None)
+def resolver_candidatos(candidatos):
+    """Primeiro candidato que abre como TTF, ou None"""
+    for nome in candidatos:
+        caminho = _caminho(nome)
+        try:
+            ImageFont.truetype(caminho, 10)
+        except OSError:
+            continue
+        return caminho
+    return None
+
+
+@lru_cache(maxsize=128)
+def carregar_candidatos(candidatos, tamanho):
+    fonte = resolver_candidatos(candidatos)
+    if fonte is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(fonte, tamanho)
+
+
+def carregar_fonte(familia='sans', peso='regular', tamanho=12):
+    """Fonte Pillow de (família, peso, tamanho), carregada uma vez por processo"""
+    return carregar_candidatos(FONTES[(familia, peso)], int(tamanho))
+
+
+def fontes_ausentes():
+    """(família, peso) sem nenhum TTF encontrado"""
+    return [chave for chave, candidatos in FONTES.items() if resolver_candidatos(candidatos) is None]
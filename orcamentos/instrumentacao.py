@@ -0,0 +1,139 @@
+"""
+Instrumentação opcional das requisições (settings.INSTRUMENTACAO).
+
+O middleware mede, por requisição, quantas consultas SQL foram feitas, o tempo
+gasto no banco, o tempo fora do banco (view + templates) e guarda as consultas
+mais lentas. Cada medição é marcada com o nome da URL e o empresa_id do usuário
+e vai para um registro circular em memória do processo, exibido na página
+orcamentos:desempenho (só staff) e em JSON em orcamentos:desempenho_json.
+
+Nada é gravado no banco: o registro é por processo e se perde ao reiniciar.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+MAX_SQL = 500
+
+
+class RegistroDesempenho:
+    """Últimas N medições do processo, seguro para várias threads"""
+
+    def __init__(self, tamanho):
+        self._medicoes = deque(maxlen=tamanho)
+        self._trava = threading.Lock()
+
+    def adicionar(self, medicao):
+        with self._trava:
+            self._medicoes.append(medicao)
+
+    def medicoes(self):
+        with self._trava:
+            return list(self._medicoes)
+
+    def limpar(self):
+        with self._trava:
+            self._medicoes.clear()
+
+    def resumo(self, medicoes=None):
+        """Agregados por nome de URL, das rotas com mais tempo total para as com menos"""
+        grupos = defaultdict(list)
+        for medicao in self.medicoes() if medicoes is None else medicoes:
+            grupos[medicao['url']].append(medicao)
+
+        linhas = []
+        for url, do_grupo in grupos.items():
+            tempos = sorted(m['tempo_ms'] for m in do_grupo)
+            consultas = [m['consultas'] for m in do_grupo]
+            quantidade = len(do_grupo)
+            linhas.append({
+                'url': url,
+                'requisicoes': quantidade,
+                'consultas_media': round(sum(consultas) / quantidade, 1),
+                'consultas_max': max(consultas),
+                'tempo_medio_ms': round(sum(tempos) / quantidade, 1),
+                'tempo_p95_ms': tempos[min(quantidade - 1, int(quantidade * 0.95))],
+                'banco_medio_ms': round(sum(m['banco_ms'] for m in do_grupo) / quantidade, 1),
+                'tempo_total_ms': round(sum(tempos), 1),
+            })
+        return sorted(linhas, key=lambda linha: linha['tempo_total_ms'], reverse=True)
+
+
+registro = RegistroDesempenho(getattr(settings, 'INSTRUMENTACAO_REGISTROS', 500))
+
+
+class _Consultas:
+    """execute_wrapper que conta e cronometra as consultas da requisição"""
+
+    def __init__(self, guardar):
+        self.guardar = guardar
+        self.quantidade = 0
+        self.tempo = 0.0
+        self.lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.quantidade += 1
+            self.tempo += duracao
+            # Heap mínimo com as `guardar` consultas mais lentas (o contador desempata)
+            item = (duracao, self.quantidade, sql[:MAX_SQL])
+            if len(self.lentas) < self.guardar:
+                heapq.heappush(self.lentas, item)
+            elif duracao > self.lentas[0][0]:
+                heapq.heapreplace(self.lentas, item)
+
+
+def _nome_url(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return request.path
+    return match.view_name
+
+
+def _empresa_id(request):
+    usuario = getattr(request, 'user', None)
+    if usuario is None or not usuario.is_authenticated:
+        return None
+    return getattr(usuario, 'empresa_id', None)
+
+
+class InstrumentacaoMiddleware:
+    """Mede consultas e tempo de cada requisição; ative com INSTRUMENTACAO=True"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.guardar = getattr(settings, 'INSTRUMENTACAO_CONSULTAS_LENTAS', 5)
+
+    def __call__(self, request):
+        consultas = _Consultas(self.guardar)
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(consultas):
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        registro.adicionar({
+            'quando': timezone.now().isoformat(),
+            'url': _nome_url(request),
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'empresa_id': _empresa_id(request),
+            'consultas': consultas.quantidade,
+            'banco_ms': round(consultas.tempo * 1000, 2),
+            'render_ms': round((duracao - consultas.tempo) * 1000, 2),
+            'tempo_ms': round(duracao * 1000, 2),
+            'lentas': [
+                {'ms': round(tempo * 1000, 2), 'sql': sql}
+                for tempo, _, sql in sorted(consultas.lentas, reverse=True)
+            ],
+        })
+        return response
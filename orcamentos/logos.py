@@ -0,0 +1,97 @@
+"""
+Cache da logo das empresas para os renders.
+
+A logo é decodificada e redimensionada uma vez por processo para cada tamanho
+usado nos documentos, com chave (caminho, mtime, tamanho do arquivo): trocar a
+logo invalida as variantes sem precisar limpar nada. O cache é um LRU limitado.
+No upload (EmpresaForm) as variantes também são gravadas em disco ao lado da
+logo, e processos novos as leem prontas em vez de redimensionar o original.
+"""
+import os
+from functools import lru_cache
+
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+
+# Largura da logo no cabeçalho dos PDFs: 40 mm a 300 dpi
+LARGURA_LOGO_PDF = 472
+# Caixas (largura, altura) da logo nos PNGs de compartilhamento, em 1080 px de largura
+CAIXAS_LOGO_PNG = ((200, 70), (120, 80))
+PASTA_VARIANTES = 'variantes'
+TAMANHO_CACHE = 32
+
+
+def _assinatura(caminho):
+    try:
+        stat = os.stat(caminho)
+    except (OSError, TypeError):
+        return None
+    return (caminho, stat.st_mtime_ns, stat.st_size)
+
+
+def caminho_variante(caminho, largura, altura=None):
+    pasta, nome = os.path.split(caminho)
+    raiz, _ = os.path.splitext(nome)
+    sufixo = f"{largura}x{altura}" if altura else f"{largura}"
+    return os.path.join(pasta, PASTA_VARIANTES, f"{raiz}_{sufixo}.png")
+
+
+def _ajustar(imagem, largura, altura=None):
+    """Redimensiona para caber em largura x altura (sem altura, só pela largura), nunca ampliando"""
+    proporcao = largura / imagem.width
+    if altura:
+        proporcao = min(proporcao, altura / imagem.height)
+    proporcao = min(proporcao, 1.0)
+    tamanho = (max(1, int(imagem.width * proporcao)), max(1, int(imagem.height * proporcao)))
+    if tamanho == imagem.size:
+        return imagem.copy()
+    return imagem.resize(tamanho, Image.LANCZOS)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _variante(assinatura, largura, altura):
+    caminho, mtime, _ = assinatura
+    pronta = caminho_variante(caminho, largura, altura)
+    try:
+        if os.stat(pronta).st_mtime_ns >= mtime:
+            with Image.open(pronta) as imagem:
+                return imagem.convert('RGBA')
+    except OSError:
+        pass
+    with Image.open(caminho) as imagem:
+        return _ajustar(imagem.convert('RGBA'), largura, altura)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _leitor_pdf(assinatura):
+    return ImageReader(_variante(assinatura, LARGURA_LOGO_PDF, None))
+
+
+def logo_pdf(caminho):
+    """ImageReader da logo pronta para o cabeçalho do PDF, ou None se não houver arquivo"""
+    assinatura = _assinatura(caminho) if caminho else None
+    if assinatura is None:
+        return None
+    return _leitor_pdf(assinatura)
+
+
+def logo_png(caminho, largura, altura=None):
+    """Logo RGBA redimensionada para caber em largura x altura, ou None se não houver arquivo"""
+    assinatura = _assinatura(caminho) if caminho else None
+    if assinatura is None:
+        return None
+    return _variante(assinatura, int(largura), int(altura) if altura else None)
+
+
+def gerar_variantes(caminho):
+    """Grava em disco as variantes usadas pelos renders (chamado no upload da logo)"""
+    with Image.open(caminho) as original:
+        imagem = original.convert('RGBA')
+    caixas = ((LARGURA_LOGO_PDF, None),) + CAIXAS_LOGO_PNG
+    geradas = []
+    for largura, altura in caixas:
+        destino = caminho_variante(caminho, largura, altura)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        _ajustar(imagem, largura, altura).save(destino, 'PNG', optimize=True)
+        geradas.append(destino)
+    return geradas
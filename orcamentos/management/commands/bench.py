@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orcamentos.bench import comparar, empresa_bench, medir
+
+
+class Command(BaseCommand):
+    help = 'Mede consultas SQL e latência (p50/p95) das rotas e renders principais numa empresa de teste (seed_bench)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresa', type=int, help='ID da empresa de teste (padrão: a com mais orçamentos)')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Execuções medidas por cenário')
+        parser.add_argument('--aquecimento', type=int, default=2, help='Execuções descartadas antes de medir')
+        parser.add_argument('--cenario', action='append', dest='cenarios', help='Só este cenário (pode repetir)')
+        parser.add_argument('--salvar', help='Grava o resultado neste JSON (novo baseline)')
+        parser.add_argument('--baseline', help='Compara com este JSON e falha se houver regressão')
+        parser.add_argument('--limite', type=float, default=0.25,
+                            help='Aumento de p50 tolerado sobre o baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        empresa = empresa_bench(options['empresa'])
+        if empresa is None:
+            raise CommandError('Nenhuma empresa de teste encontrada. Rode `manage.py seed_bench` antes.')
+
+        resultado = medir(
+            empresa,
+            repeticoes=options['repeticoes'],
+            aquecimento=options['aquecimento'],
+            cenarios=options['cenarios'],
+        )
+        escala = resultado['escala']
+        self.stdout.write(
+            f"{empresa.nome}: {escala['orcamentos']} orçamentos, {escala['clientes']} clientes, {escala['itens']} itens"
+        )
+        self.stdout.write(f"{'cenário':<22}{'consultas':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for nome, medida in resultado['cenarios'].items():
+            self.stdout.write(f"{nome:<22}{medida['consultas']:>10}{medida['p50_ms']:>10}{medida['p95_ms']:>10}")
+
+        if options['salvar']:
+            with open(options['salvar'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultado gravado em {options['salvar']}.")
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as arquivo:
+                baseline = json.load(arquivo)
+            regressoes = comparar(resultado, baseline, options['limite'])
+            if regressoes:
+                for regressao in regressoes:
+                    self.stderr.write(regressao)
+                raise CommandError(f'{len(regressoes)} regressão(ões) em relação a {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS(f"Sem regressões em relação a {options['baseline']}."))
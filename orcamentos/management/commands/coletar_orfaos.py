@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from orcamentos.documentos import coletar_orfaos
+
+
+class Command(BaseCommand):
+    help = 'Apaga arquivos gerados (PDF/PNG) que nenhum orçamento nem o cache de documentos referencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Retenção: só apaga arquivos mais antigos que isso')
+        parser.add_argument('--lote', type=int, default=500, help='Arquivos conferidos no banco por consulta')
+        parser.add_argument('--limite', type=int, default=0, help='Máximo de arquivos apagados nesta execução (0 = sem limite)')
+        parser.add_argument('--simular', action='store_true', help='Só relata o que seria apagado')
+
+    def handle(self, *args, **options):
+        resultado = coletar_orfaos(
+            dias=options['dias'],
+            lote=options['lote'],
+            limite=options['limite'],
+            simular=options['simular'],
+        )
+        verbo = 'seriam apagados' if options['simular'] else 'apagados'
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['verificados']} arquivo(s) verificado(s), {resultado['apagados']} {verbo}, "
+            f"{filesizeformat(resultado['bytes'])} recuperado(s)"
+        ))
@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import Empresa
+from orcamentos.models import Cliente, Item, Orcamento, OrcamentoItem
+from relatorios.models import ResumoMensal
+
+
+def consultas_quentes(empresa):
+    """As consultas das views mais acessadas, montadas como nas próprias views"""
+    hoje = timezone.localdate()
+    item = Item.objects.filter(empresa=empresa).first()
+    locado = Q(
+        orcamentoitem__orcamento__empresa=empresa,
+        orcamentoitem__orcamento__status__in=['confirmado', 'concluido'],
+    )
+    orcamentos = Orcamento.objects.filter(empresa=empresa)
+    return {
+        'lista_orcamentos': orcamentos.select_related('cliente').order_by('-data_criacao', '-id')[:20],
+        'lista_orcamentos_valor': orcamentos.select_related('cliente').order_by('-total', '-id')[:20],
+        'lista_orcamentos_status': orcamentos.filter(status='pendente').order_by('-data_criacao', '-id')[:20],
+        'contagem_status': orcamentos.order_by().values('status').annotate(quantidade=Count('id')),
+        'conflito_data': orcamentos.filter(data_evento=hoje, status='confirmado'),
+        'agendamentos': orcamentos.filter(
+            status__in=['confirmado', 'concluido', 'reagendado'], data_evento__gte=hoje,
+        ).order_by('data_evento', 'hora_evento'),
+        'agendamentos_concluidos': orcamentos.filter(
+            status='concluido', data_evento__gte=hoje - timedelta(days=30),
+        ).order_by('-data_evento'),
+        'calendario': orcamentos.filter(
+            data_evento__range=[hoje - timedelta(days=7), hoje + timedelta(days=35)],
+        ).exclude(status='cancelado').order_by().values('data_evento', 'status').annotate(quantidade=Count('id')),
+        'resumo_mensal_recalcular': ResumoMensal._agregar(orcamentos.filter(
+            data_evento__gte=hoje.replace(day=1), data_evento__lt=hoje.replace(day=1) + timedelta(days=32),
+        )),
+        'dashboard_resumo': ResumoMensal.objects.filter(empresa=empresa, mes__gte=hoje - timedelta(days=365)),
+        'cliente_por_telefone': Cliente.objects.filter(empresa=empresa, telefone='(11) 90000-0000'),
+        'lista_clientes': Cliente.objects.filter(empresa=empresa).order_by('nome', 'id')[:20],
+        'clientes_com_orcamento': orcamentos.order_by().values('cliente').distinct(),
+        'novos_clientes': Cliente.objects.filter(
+            empresa=empresa, data_cadastro__gte=timezone.now() - timedelta(days=30),
+        ),
+        'lista_itens': Item.objects.filter(empresa=empresa).annotate(
+            uso_count=Count('orcamentoitem', filter=locado),
+        ).order_by('nome', 'descricao')[:24],
+        'item_em_uso': OrcamentoItem.objects.filter(item=item, orcamento__empresa=empresa),
+    }
+
+
+def _problemas_sqlite(plano):
+    """Linhas do EXPLAIN QUERY PLAN que percorrem a tabela inteira ou ordenam fora de índice"""
+    varreduras, ordenacoes = [], []
+    for linha in plano.splitlines():
+        detalhe = linha.split(' ', 3)[-1]
+        if detalhe.startswith('SCAN ') and ' USING ' not in detalhe:
+            varreduras.append(detalhe)
+        elif 'TEMP B-TREE' in detalhe:
+            ordenacoes.append(detalhe)
+    return varreduras, ordenacoes
+
+
+def _problemas_mysql(plano):
+    """Tabelas com access_type ALL e ordenações em filesort no EXPLAIN FORMAT=JSON"""
+    varreduras, ordenacoes = [], []
+
+    def percorrer(no):
+        if isinstance(no, dict):
+            if no.get('access_type') == 'ALL':
+                varreduras.append(f"ALL {no.get('table_name', '?')}")
+            if no.get('using_filesort'):
+                ordenacoes.append('filesort')
+            for valor in no.values():
+                percorrer(valor)
+        elif isinstance(no, list):
+            for valor in no:
+                percorrer(valor)
+
+    percorrer(json.loads(plano))
+    return varreduras, ordenacoes
+
+
+class Command(BaseCommand):
+    help = 'Roda EXPLAIN nas consultas mais usadas (SQLite/MySQL) e aponta varreduras completas de tabela'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresa', type=int, help='ID da empresa usada nos filtros (padrão: a primeira)')
+        parser.add_argument('--consulta', action='append', dest='consultas', help='Só esta consulta (pode repetir)')
+        parser.add_argument('--plano', action='store_true', help='Mostra o plano completo de cada consulta')
+        parser.add_argument('--estrito', action='store_true', help='Sai com erro se houver varredura completa')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            formato, analisar = None, _problemas_sqlite
+        elif connection.vendor == 'mysql':
+            formato, analisar = 'JSON', _problemas_mysql
+        else:
+            raise CommandError(f'EXPLAIN não suportado para o banco {connection.vendor}.')
+
+        empresas = Empresa.objects.order_by('id')
+        empresa = empresas.filter(pk=options['empresa']).first() if options['empresa'] else empresas.first()
+        if empresa is None:
+            raise CommandError('Empresa não encontrada.')
+
+        com_varredura = []
+        for nome, queryset in consultas_quentes(empresa).items():
+            if options['consultas'] and nome not in options['consultas']:
+                continue
+            plano = queryset.explain(format=formato) if formato else queryset.explain()
+            varreduras, ordenacoes = analisar(plano)
+
+            if varreduras:
+                com_varredura.append(nome)
+                self.stdout.write(self.style.ERROR(f"{nome}: varredura completa ({'; '.join(varreduras)})"))
+            elif ordenacoes:
+                self.stdout.write(self.style.WARNING(f"{nome}: usa índice, ordenação fora do índice"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{nome}: ok"))
+            if options['plano']:
+                self.stdout.write(f"    {plano}".replace('\n', '\n    '))
+
+        if com_varredura and options['estrito']:
+            raise CommandError(f"{len(com_varredura)} consulta(s) com varredura completa: {', '.join(com_varredura)}")
@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Empresa
+from orcamentos.exportacao import FORMATOS, exportar_pdf_unico, exportar_zip, orcamentos_para_exportar
+
+
+class Command(BaseCommand):
+    help = 'Exporta os documentos (PDF) dos orçamentos filtrados num ZIP ou num único PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('saida', help='Arquivo de destino')
+        parser.add_argument('--empresa', type=int, help='ID da empresa')
+        parser.add_argument('--inicio', type=date.fromisoformat, help='Data do evento inicial (AAAA-MM-DD)')
+        parser.add_argument('--fim', type=date.fromisoformat, help='Data do evento final (AAAA-MM-DD)')
+        parser.add_argument('--status', help='Status dos orçamentos')
+        parser.add_argument('--formato', choices=FORMATOS, default='zip')
+        parser.add_argument('--processos', type=int, help='Processos de renderização (padrão: um por núcleo)')
+
+    def handle(self, *args, **options):
+        empresa = None
+        if options['empresa']:
+            try:
+                empresa = Empresa.objects.get(pk=options['empresa'])
+            except Empresa.DoesNotExist:
+                raise CommandError(f"Empresa {options['empresa']} não encontrada")
+
+        orcamentos = orcamentos_para_exportar(empresa, options['inicio'], options['fim'], options['status'])
+        quantidade = orcamentos.count()
+        if not quantidade:
+            raise CommandError('Nenhum orçamento encontrado com esses filtros')
+
+        if options['formato'] == 'pdf':
+            exportar_pdf_unico(orcamentos, options['saida'], options['processos'])
+        else:
+            with open(options['saida'], 'wb') as arquivo:
+                for parte in exportar_zip(orcamentos, options['processos']):
+                    arquivo.write(parte)
+
+        self.stdout.write(self.style.SUCCESS(f"{quantidade} documento(s) exportado(s) para {options['saida']}"))
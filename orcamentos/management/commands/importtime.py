@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+# Bibliotecas de render que não deveriam ser carregadas só para subir o projeto
+PESADOS = ('reportlab', 'PIL', 'pdf2image', 'img2pdf', 'pikepdf')
+
+# O mesmo caminho de um cold start: setup do Django e carga de todas as URLs (e das views)
+PARTIDA = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+def medir_partida():
+    """Roda a partida num processo limpo com -X importtime e devolve [(módulo, self µs, acumulado µs)]"""
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PARTIDA],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if processo.returncode:
+        raise CommandError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else 'Falha na partida')
+
+    modulos = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|', 2)
+        modulos.append((nome.strip(), int(proprio), int(acumulado)))
+    return modulos
+
+
+def _grupo(modulo, apps_projeto):
+    """App do projeto dono do módulo, ou o pacote de topo"""
+    for app in apps_projeto:
+        if modulo == app or modulo.startswith(app + '.'):
+            return app
+    return modulo.split('.')[0]
+
+
+class Command(BaseCommand):
+    help = 'Mede o custo de import da partida do projeto (setup + URLs), por app e por pacote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Quantos grupos listar')
+
+    def handle(self, *args, **options):
+        modulos = medir_partida()
+        # Apps mais específicos primeiro (ex.: django.contrib.admin antes de django)
+        apps_projeto = sorted((config.name for config in apps.get_app_configs()), key=len, reverse=True)
+
+        por_grupo = defaultdict(int)
+        for nome, proprio, _ in modulos:
+            por_grupo[_grupo(nome, apps_projeto)] += proprio
+        total = sum(por_grupo.values())
+
+        self.stdout.write(f"{'ms':>9}  {'%':>5}  grupo")
+        for grupo, proprio in sorted(por_grupo.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"{proprio / 1000:9.1f}  {100 * proprio / total:5.1f}  {grupo}")
+        self.stdout.write(f"{total / 1000:9.1f}  100.0  total ({len(modulos)} módulos)")
+
+        carregados = sorted({nome.split('.')[0] for nome, _, _ in modulos if nome.split('.')[0] in PESADOS})
+        if carregados:
+            self.stdout.write(self.style.WARNING(
+                f"Bibliotecas de render carregadas na partida: {', '.join(carregados)}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('Nenhuma biblioteca de render carregada na partida'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orcamentos.documentos import limpar_arquivos_descartados
+
+
+class Command(BaseCommand):
+    help = 'Apaga do storage, em lotes, os arquivos de documentos descartados que não são mais usados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=200, help='Arquivos verificados por lote')
+
+    def handle(self, *args, **options):
+        apagados = limpar_arquivos_descartados(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{apagados} arquivo(s) apagado(s)'))
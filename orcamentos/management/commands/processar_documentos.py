@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orcamentos.documentos import (
+    coletar_orfaos, limpar_arquivos_descartados, liberar_tarefas_presas, processar_proxima_tarefa,
+)
+from orcamentos.models import TarefaDocumento
+
+
+class Command(BaseCommand):
+    help = 'Worker da fila de documentos: pré-renderiza os PDFs dos orçamentos enfileirados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Esvazia a fila e sai (útil em cron)')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos de espera com a fila vazia')
+        parser.add_argument('--manter-dias', type=int, default=7, help='Dias de histórico de tarefas concluídas')
+        parser.add_argument('--coleta-horas', type=float, default=24,
+                            help='Intervalo entre coletas de arquivos órfãos (0 desliga)')
+        parser.add_argument('--retencao-dias', type=int, default=7, help='Idade mínima de um órfão para ser apagado')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Processando fila de documentos...')
+        ultima_coleta = None
+        while True:
+            liberar_tarefas_presas()
+            processadas = 0
+            while True:
+                tarefa = processar_proxima_tarefa()
+                if tarefa is None:
+                    break
+                processadas += 1
+                estilo = self.style.SUCCESS if tarefa.status == 'concluida' else self.style.WARNING
+                self.stdout.write(estilo(f'Orçamento #{tarefa.orcamento_id}: {tarefa.get_status_display()} {tarefa.erro}'.rstrip()))
+
+            if processadas:
+                limite = timezone.now() - timedelta(days=options['manter_dias'])
+                TarefaDocumento.objects.filter(status='concluida', atualizada_em__lt=limite).delete()
+            # Arquivos substituídos pelos renders (e descartados pelas views) saem em lote
+            limpar_arquivos_descartados()
+
+            coleta = timedelta(hours=options['coleta_horas'])
+            if coleta and (ultima_coleta is None or timezone.now() - ultima_coleta >= coleta):
+                resultado = coletar_orfaos(dias=options['retencao_dias'])
+                ultima_coleta = timezone.now()
+                if resultado['apagados']:
+                    self.stdout.write(f"{resultado['apagados']} arquivo(s) órfão(s) apagado(s) ({resultado['bytes']} bytes)")
+
+            if options['uma_vez']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orcamentos.models import Orcamento
+
+
+class Command(BaseCommand):
+    help = 'Preenche e confere os totais persistidos (subtotal/total/saldo) dos orçamentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresa', type=int, help='Limita a uma empresa (id)')
+        parser.add_argument(
+            '--verificar',
+            action='store_true',
+            help='Apenas confere os valores gravados, sem alterar nada (sai com erro se houver divergência)',
+        )
+
+    def handle(self, *args, **options):
+        orcamentos = Orcamento.objects.order_by('pk')
+        if options['empresa']:
+            orcamentos = orcamentos.filter(empresa_id=options['empresa'])
+
+        verificar = options['verificar']
+        divergentes = 0
+        total = 0
+        for orcamento in orcamentos.iterator(chunk_size=500):
+            total += 1
+            gravados = (orcamento.subtotal, orcamento.total, orcamento.saldo)
+            if orcamento.recalcular_totais(commit=not verificar):
+                divergentes += 1
+                self.stdout.write(
+                    f'Orçamento #{orcamento.pk}: gravado {gravados} -> '
+                    f'calculado {(orcamento.subtotal, orcamento.total, orcamento.saldo)}'
+                )
+
+        if verificar:
+            if divergentes:
+                raise CommandError(f'{divergentes} de {total} orçamentos com totais divergentes.')
+            self.stdout.write(self.style.SUCCESS(f'{total} orçamentos conferidos, nenhum divergente.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{total} orçamentos processados, {divergentes} atualizados.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orcamentos.busca import reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca (full-text) dos orçamentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresa', type=int, help='Limita a uma empresa (id)')
+
+    def handle(self, *args, **options):
+        total = reconstruir_indice(empresa_id=options['empresa'])
+        self.stdout.write(self.style.SUCCESS(f'{total} orçamentos indexados.'))
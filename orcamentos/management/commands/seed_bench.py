@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from orcamentos.bench import PREFIXO_EMPRESA, apagar_dados_bench, semear
+
+
+class Command(BaseCommand):
+    help = f'Gera empresas de teste ("{PREFIXO_EMPRESA} ...") com clientes, catálogo e orçamentos para o benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresas', type=int, default=3, help='Empresas a criar')
+        parser.add_argument('--clientes', type=int, default=200, help='Clientes por empresa')
+        parser.add_argument('--itens', type=int, default=60, help='Itens de catálogo por empresa')
+        parser.add_argument('--orcamentos', type=int, default=2000, help='Orçamentos por empresa')
+        parser.add_argument('--itens-por-orcamento', type=int, default=6, help='Máximo de itens em cada orçamento')
+        parser.add_argument('--anos', type=int, default=3, help='Anos de histórico (mais 6 meses de eventos futuros)')
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (mesma semente, mesmos dados)')
+        parser.add_argument('--limpar', action='store_true', help='Apaga as empresas de teste existentes antes de gerar')
+
+    def handle(self, *args, **options):
+        if options['limpar']:
+            apagados = apagar_dados_bench()
+            self.stdout.write(f'{apagados} registro(s) de teste apagado(s).')
+
+        resultado = semear(
+            empresas=options['empresas'],
+            clientes=options['clientes'],
+            itens=options['itens'],
+            orcamentos=options['orcamentos'],
+            itens_por_orcamento=options['itens_por_orcamento'],
+            anos=options['anos'],
+            semente=options['semente'],
+            progresso=lambda empresa: self.stdout.write(f'{empresa.nome} (id {empresa.pk}) criada.'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado['empresas'])} empresa(s), {resultado['clientes']} clientes, {resultado['itens']} itens, "
+            f"{resultado['orcamentos']} orçamentos e {resultado['linhas']} linhas gerados."
+        ))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:45
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def preencher_totais(apps, schema_editor):
+    Orcamento = apps.get_model('orcamentos', 'Orcamento')
+    centavos = Decimal('0.01')
+    for orcamento in Orcamento.objects.prefetch_related('itens').iterator(chunk_size=500):
+        subtotal = Decimal('0')
+        for item in orcamento.itens.all():
+            bruto = (item.valor or Decimal('0')) * item.quantidade
+            subtotal += bruto - (bruto * (item.desconto or Decimal('0')) / 100)
+        subtotal = subtotal.quantize(centavos)
+        total = (subtotal - subtotal * orcamento.desconto_geral / 100 + orcamento.valor_adicional).quantize(centavos)
+        Orcamento.objects.filter(pk=orcamento.pk).update(
+            subtotal=subtotal,
+            total=total,
+            saldo=(total - orcamento.valor_pago).quantize(centavos),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0016_item_percentual_lucro'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orcamento',
+            name='saldo',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='orcamento',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='orcamento',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(preencher_totais, migrations.RunPython.noop),
+    ]
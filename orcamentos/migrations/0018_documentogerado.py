@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0017_orcamento_subtotal_total_saldo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoGerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, unique=True)),
+                ('arquivo', models.FileField(upload_to='orcamentos/cache/')),
+                ('tamanho', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('acessado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('orcamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documentos', to='orcamentos.orcamento')),
+            ],
+            options={
+                'verbose_name': 'Documento Gerado',
+                'verbose_name_plural': 'Documentos Gerados',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0018_documentogerado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('erro', models.TextField(blank=True)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+                ('orcamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarefas_documento', to='orcamentos.orcamento')),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Documento',
+                'verbose_name_plural': 'Tarefas de Documento',
+                'indexes': [models.Index(fields=['status', 'criada_em'], name='tarefa_doc_status_criada')],
+            },
+        ),
+    ]
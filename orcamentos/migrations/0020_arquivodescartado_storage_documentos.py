@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:01
+
+import orcamentos.armazenamento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0019_tarefadocumento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoDescartado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255)),
+                ('descartado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Arquivo Descartado',
+                'verbose_name_plural': 'Arquivos Descartados',
+            },
+        ),
+        migrations.AlterField(
+            model_name='documentogerado',
+            name='arquivo',
+            field=models.FileField(storage=orcamentos.armazenamento.storage_documentos, upload_to='orcamentos/cache/'),
+        ),
+        migrations.AlterField(
+            model_name='orcamento',
+            name='pdf',
+            field=models.FileField(blank=True, null=True, storage=orcamentos.armazenamento.storage_documentos, upload_to='orcamentos/pdf/'),
+        ),
+        migrations.AlterField(
+            model_name='orcamento',
+            name='png',
+            field=models.ImageField(blank=True, null=True, storage=orcamentos.armazenamento.storage_documentos, upload_to='orcamentos/png/'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:02
+
+import django.db.models.deletion
+import orcamentos.armazenamento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0020_arquivodescartado_storage_documentos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImagemDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pagina', models.PositiveSmallIntegerField(default=1)),
+                ('dpi', models.PositiveSmallIntegerField()),
+                ('formato', models.CharField(max_length=4)),
+                ('arquivo', models.FileField(storage=orcamentos.armazenamento.storage_documentos, upload_to='orcamentos/imagens/')),
+                ('tamanho', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('documento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imagens', to='orcamentos.documentogerado')),
+            ],
+            options={
+                'verbose_name': 'Imagem de Documento',
+                'verbose_name_plural': 'Imagens de Documento',
+                'constraints': [models.UniqueConstraint(fields=('documento', 'pagina', 'dpi', 'formato'), name='imagem_documento_unica')],
+            },
+        ),
+    ]
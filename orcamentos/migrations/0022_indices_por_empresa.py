@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_empresa_capacidade_diaria'),
+        ('orcamentos', '0021_imagemdocumento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['empresa', 'telefone'], name='cliente_empresa_telefone'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['empresa', 'nome'], name='cliente_empresa_nome'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['empresa', 'data_cadastro'], name='cliente_empresa_cadastro'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['empresa', 'nome'], name='item_empresa_nome'),
+        ),
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['empresa', 'status', 'data_evento'], name='orcamento_emp_status_evento'),
+        ),
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['empresa', 'data_evento'], name='orcamento_empresa_evento'),
+        ),
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['empresa', 'data_criacao'], name='orcamento_empresa_criacao'),
+        ),
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['empresa', 'cliente'], name='orcamento_empresa_cliente'),
+        ),
+        migrations.AddIndex(
+            model_name='orcamentoitem',
+            index=models.Index(fields=['item', 'orcamento'], name='orcamento_item_item_orc'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:11
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COLUNAS = 'cliente, telefone, observacoes, itens'
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE orcamentos_busca_fts USING fts5("
+    f"{COLUNAS}, tokenize = 'unicode61 remove_diacritics 2')",
+    # A tabela FTS acompanha orcamentos_indicebusca por triggers (rowid = orcamento_id).
+    # Uma migração que reconstrua orcamentos_indicebusca no SQLite precisa recriá-los.
+    "CREATE TRIGGER orcamentos_busca_ai AFTER INSERT ON orcamentos_indicebusca BEGIN "
+    f"INSERT INTO orcamentos_busca_fts(rowid, {COLUNAS}) "
+    "VALUES (new.orcamento_id, new.cliente, new.telefone, new.observacoes, new.itens); END",
+    "CREATE TRIGGER orcamentos_busca_ad AFTER DELETE ON orcamentos_indicebusca BEGIN "
+    "DELETE FROM orcamentos_busca_fts WHERE rowid = old.orcamento_id; END",
+    "CREATE TRIGGER orcamentos_busca_au AFTER UPDATE ON orcamentos_indicebusca BEGIN "
+    "DELETE FROM orcamentos_busca_fts WHERE rowid = old.orcamento_id; "
+    f"INSERT INTO orcamentos_busca_fts(rowid, {COLUNAS}) "
+    "VALUES (new.orcamento_id, new.cliente, new.telefone, new.observacoes, new.itens); END",
+]
+SQLITE_REVERSO = [
+    "DROP TRIGGER IF EXISTS orcamentos_busca_au",
+    "DROP TRIGGER IF EXISTS orcamentos_busca_ad",
+    "DROP TRIGGER IF EXISTS orcamentos_busca_ai",
+    "DROP TABLE IF EXISTS orcamentos_busca_fts",
+]
+MYSQL = [f"ALTER TABLE orcamentos_indicebusca ADD FULLTEXT INDEX indice_busca_fulltext ({COLUNAS})"]
+MYSQL_REVERSO = ["ALTER TABLE orcamentos_indicebusca DROP INDEX indice_busca_fulltext"]
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def criar_indice_fulltext(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE, 'mysql': MYSQL})
+
+
+def remover_indice_fulltext(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE_REVERSO, 'mysql': MYSQL_REVERSO})
+
+
+def preencher_indice(apps, schema_editor):
+    Orcamento = apps.get_model('orcamentos', 'Orcamento')
+    IndiceBusca = apps.get_model('orcamentos', 'IndiceBusca')
+    linhas = []
+    for orcamento in Orcamento.objects.select_related('cliente').prefetch_related('itens__item').iterator(chunk_size=500):
+        telefone = orcamento.cliente.telefone or ''
+        digitos = re.sub(r'\D', '', telefone)
+        linhas.append(IndiceBusca(
+            orcamento_id=orcamento.pk,
+            cliente=orcamento.cliente.nome,
+            telefone=f"{telefone} {digitos}".strip(),
+            observacoes=orcamento.observacoes or '',
+            itens=' '.join(f"{linha.item.nome or ''} {linha.item.descricao}" for linha in orcamento.itens.all()),
+        ))
+        if len(linhas) >= 500:
+            IndiceBusca.objects.bulk_create(linhas)
+            linhas = []
+    IndiceBusca.objects.bulk_create(linhas)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orcamentos', '0022_indices_por_empresa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusca',
+            fields=[
+                ('orcamento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='indice_busca', serialize=False, to='orcamentos.orcamento')),
+                ('cliente', models.CharField(blank=True, max_length=100)),
+                ('telefone', models.CharField(blank=True, max_length=50)),
+                ('observacoes', models.TextField(blank=True)),
+                ('itens', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Índice de Busca',
+                'verbose_name_plural': 'Índices de Busca',
+            },
+        ),
+        migrations.RunPython(criar_indice_fulltext, remover_indice_fulltext),
+        migrations.RunPython(preencher_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_empresa_capacidade_diaria'),
+        ('orcamentos', '0023_indicebusca'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['empresa', 'total'], name='orcamento_empresa_total'),
+        ),
+    ]
@@ -1,7 +1,63 @@
-from django.db import models
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Sum, F, Value, DecimalField, ExpressionWrapper
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from accounts.models import Empresa, Usuario
 
+from .armazenamento import storage_documentos
+
+
+CENTAVOS = Decimal('0.01')
+
+# Orçamentos com as linhas sendo trocadas por Orcamento.substituir_itens(): os
+# signals de OrcamentoItem não recalculam nem reindexam linha a linha
+_itens_em_substituicao = ContextVar('itens_em_substituicao', default=frozenset())
+
+
+def itens_em_substituicao(orcamento_id):
+    return orcamento_id in _itens_em_substituicao.get()
+
+
+@contextmanager
+def _substituindo_itens(orcamento_id):
+    token = _itens_em_substituicao.set(_itens_em_substituicao.get() | {orcamento_id})
+    try:
+        yield
+    finally:
+        _itens_em_substituicao.reset(token)
+
+
+def _decimal(valor):
+    """Converte valores vindos de formulários (float/str/None) para Decimal"""
+    if valor is None or valor == '':
+        return Decimal('0')
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+def calcular_valor_linha(valor, quantidade, desconto):
+    """Valor de uma linha do orçamento já com o desconto percentual do item"""
+    bruto = _decimal(valor) * (quantidade or 0)
+    return bruto - (bruto * _decimal(desconto) / 100)
+
+
+def expressao_valor_linha(prefixo=''):
+    """
+    Mesma conta de calcular_valor_linha() em SQL. `prefixo` permite usar a
+    expressão a partir de outro model (ex.: 'orcamentoitem__' em Item)
+    """
+    decimal = DecimalField(max_digits=14, decimal_places=2)
+    desconto = Coalesce(F(f'{prefixo}desconto'), Value(Decimal('0')), output_field=decimal)
+    return ExpressionWrapper(
+        F(f'{prefixo}valor') * F(f'{prefixo}quantidade') * (Value(Decimal('100')) - desconto) / Value(Decimal('100')),
+        output_field=decimal,
+    )
+
 
 class Cliente(models.Model):
     empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='clientes')
@@ -25,15 +81,18 @@ class Cliente(models.Model):
         return self.orcamentos.filter(status='pendente').count()
     
     def valor_total_orcamentos(self):
-        total = 0
-        for orcamento in self.orcamentos.all():
-            if hasattr(orcamento, 'total'):
-                total += orcamento.total
-        return total
+        return self.orcamentos.aggregate(soma=Sum('total'))['soma'] or Decimal('0.00')
 
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            # Busca do cliente pelo telefone ao criar orçamento
+            models.Index(fields=['empresa', 'telefone'], name='cliente_empresa_telefone'),
+            # Ordenações da lista de clientes e novos clientes do dashboard
+            models.Index(fields=['empresa', 'nome'], name='cliente_empresa_nome'),
+            models.Index(fields=['empresa', 'data_cadastro'], name='cliente_empresa_cadastro'),
+        ]
 
 
 class Item(models.Model):
@@ -64,6 +123,9 @@ class Item(models.Model):
     class Meta:
         verbose_name = "Item"
         verbose_name_plural = "Itens"
+        indexes = [
+            models.Index(fields=['empresa', 'nome'], name='item_empresa_nome'),
+        ]
 
 
 class Orcamento(models.Model):
@@ -84,27 +146,73 @@ class Orcamento(models.Model):
     desconto_geral = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     observacoes = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
-    pdf = models.FileField(upload_to='orcamentos/pdf/', blank=True, null=True)
-    png = models.ImageField(upload_to='orcamentos/png/', blank=True, null=True)
+    pdf = models.FileField(upload_to='orcamentos/pdf/', storage=storage_documentos, blank=True, null=True)
+    png = models.ImageField(upload_to='orcamentos/png/', storage=storage_documentos, blank=True, null=True)
     tipo_evento = models.CharField(max_length=100, blank=False, default='Aniversário') # tipo do evento
     valor_adicional = models.DecimalField(max_digits=10, decimal_places=2, default=0) # valor adicional
     endereco = models.TextField(blank=False)
     valor_pago = models.DecimalField(max_digits=10, decimal_places=2, default=0) # valor pago
     custo_operacional = models.DecimalField(max_digits=10, decimal_places=2, default=0) # custo operacional
+    # Totais desnormalizados, mantidos por recalcular_totais() e pelos signals de OrcamentoItem
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False) # soma das linhas com desconto do item
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False) # subtotal - desconto geral + adicional
+    saldo = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False) # total - valor pago
     
     def __str__(self):
         return f"Orçamento #{self.id} - {self.cliente.nome}"
-    
-    @property
-    def total(self):
-        """Calcula o total do orçamento"""
-        total = sum(item.valor * item.quantidade for item in self.itens.all())
-        return total - (total * (self.desconto_geral or 0) / 100) + (self.valor_adicional or 0)
-    
-    @property
-    def saldo(self):
-        """Calcula o saldo devedor"""
-        return self.total - (self.valor_pago or 0)
+
+    def save(self, *args, **kwargs):
+        # desconto_geral, valor_adicional e valor_pago só afetam total/saldo,
+        # então o subtotal persistido é reaproveitado sem consultar os itens
+        self.atualizar_total_e_saldo()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'total', 'saldo'}
+        super().save(*args, **kwargs)
+
+    def calcular_subtotal(self):
+        """Soma as linhas do orçamento (valor snapshot x quantidade - desconto do item)"""
+        subtotal = sum(
+            (calcular_valor_linha(valor, quantidade, desconto)
+             for valor, quantidade, desconto in self.itens.values_list('valor', 'quantidade', 'desconto')),
+            Decimal('0'),
+        )
+        return subtotal.quantize(CENTAVOS)
+
+    def atualizar_total_e_saldo(self):
+        """Recalcula total e saldo a partir do subtotal já persistido"""
+        subtotal = _decimal(self.subtotal)
+        desconto = subtotal * _decimal(self.desconto_geral) / 100
+        self.total = (subtotal - desconto + _decimal(self.valor_adicional)).quantize(CENTAVOS)
+        self.saldo = (self.total - _decimal(self.valor_pago)).quantize(CENTAVOS)
+
+    def recalcular_totais(self, commit=True):
+        """Recalcula subtotal, total e saldo a partir dos itens. Retorna True se algo mudou"""
+        anteriores = (self.subtotal, self.total, self.saldo)
+        self.subtotal = self.calcular_subtotal()
+        self.atualizar_total_e_saldo()
+        mudou = anteriores != (self.subtotal, self.total, self.saldo)
+        if commit and mudou and self.pk:
+            self.save(update_fields=['subtotal', 'total', 'saldo'])
+        return mudou
+
+    def substituir_itens(self, linhas, commit=True):
+        """
+        Troca todas as linhas do orçamento por `linhas` (OrcamentoItem ainda não
+        salvos) com um DELETE e um INSERT, recalculando os totais e o índice de
+        busca uma vez no fim em vez de uma por linha. Com commit=False os totais
+        ficam só na instância, para o save() seguinte gravá-los junto
+        """
+        from .busca import agendar_indexacao
+
+        with transaction.atomic(), _substituindo_itens(self.pk):
+            self.itens.all().delete()
+            for linha in linhas:
+                linha.orcamento = self
+            OrcamentoItem.objects.bulk_create(linhas)
+        getattr(self, '_prefetched_objects_cache', {}).pop('itens', None)
+        self.recalcular_totais(commit=commit)
+        agendar_indexacao([self.pk])
     
     @property
     def dias_para_evento(self):
@@ -123,6 +231,18 @@ class Orcamento(models.Model):
     class Meta:
         verbose_name = "Orçamento"
         verbose_name_plural = "Orçamentos"
+        indexes = [
+            # Agenda, conflitos de data e contagens por status
+            models.Index(fields=['empresa', 'status', 'data_evento'], name='orcamento_emp_status_evento'),
+            # Calendário e resumo mensal (faixa de datas sem status fixo)
+            models.Index(fields=['empresa', 'data_evento'], name='orcamento_empresa_evento'),
+            # Lista de orçamentos, ordenada pela criação
+            models.Index(fields=['empresa', 'data_criacao'], name='orcamento_empresa_criacao'),
+            # Clientes distintos com orçamento (lista de clientes)
+            models.Index(fields=['empresa', 'cliente'], name='orcamento_empresa_cliente'),
+            # Lista de orçamentos ordenada por valor (total persistido)
+            models.Index(fields=['empresa', 'total'], name='orcamento_empresa_total'),
+        ]
 
 
 class OrcamentoItem(models.Model):
@@ -137,4 +257,105 @@ class OrcamentoItem(models.Model):
 
     class Meta:
         verbose_name = "Item do Orçamento"
-        verbose_name_plural = "Itens do Orçamento"
\ No newline at end of file
+        verbose_name_plural = "Itens do Orçamento"
+        indexes = [
+            # Uso e faturamento por item (lista de itens) sem voltar à tabela para achar o orçamento
+            models.Index(fields=['item', 'orcamento'], name='orcamento_item_item_orc'),
+        ]
+
+
+class DocumentoGerado(models.Model):
+    """Índice do cache de documentos renderizados, endereçado pelo conteúdo"""
+    orcamento = models.ForeignKey(Orcamento, on_delete=models.CASCADE, related_name='documentos')
+    chave = models.CharField(max_length=64, unique=True) # sha256 das entradas do render
+    arquivo = models.FileField(upload_to='orcamentos/cache/', storage=storage_documentos)
+    tamanho = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    acessado_em = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.arquivo.name} ({self.orcamento_id})"
+
+    class Meta:
+        verbose_name = "Documento Gerado"
+        verbose_name_plural = "Documentos Gerados"
+
+
+class ImagemDocumento(models.Model):
+    """Página de um documento do cache rasterizada em imagem (compartilhamento no WhatsApp)"""
+    documento = models.ForeignKey(DocumentoGerado, on_delete=models.CASCADE, related_name='imagens')
+    pagina = models.PositiveSmallIntegerField(default=1)
+    dpi = models.PositiveSmallIntegerField()
+    formato = models.CharField(max_length=4) # png, jpeg ou webp
+    arquivo = models.FileField(upload_to='orcamentos/imagens/', storage=storage_documentos)
+    tamanho = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.arquivo.name} (p. {self.pagina}, {self.dpi} dpi)"
+
+    class Meta:
+        verbose_name = "Imagem de Documento"
+        verbose_name_plural = "Imagens de Documento"
+        constraints = [
+            models.UniqueConstraint(fields=['documento', 'pagina', 'dpi', 'formato'], name='imagem_documento_unica'),
+        ]
+
+
+class ArquivoDescartado(models.Model):
+    """Arquivo de documento a apagar do storage; a limpeza roda em lote, fora das requisições"""
+    nome = models.CharField(max_length=255)
+    descartado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.nome
+
+    class Meta:
+        verbose_name = "Arquivo Descartado"
+        verbose_name_plural = "Arquivos Descartados"
+
+
+
+class TarefaDocumento(models.Model):
+    """Fila local (no banco) de pré-renderização de documentos"""
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluida', 'Concluída'),
+        ('erro', 'Erro'),
+    ]
+    orcamento = models.ForeignKey(Orcamento, on_delete=models.CASCADE, related_name='tarefas_documento')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    erro = models.TextField(blank=True)
+    criada_em = models.DateTimeField(auto_now_add=True)
+    atualizada_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Documento do orçamento #{self.orcamento_id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Tarefa de Documento"
+        verbose_name_plural = "Tarefas de Documento"
+        indexes = [
+            models.Index(fields=['status', 'criada_em'], name='tarefa_doc_status_criada'),
+        ]
+
+
+class IndiceBusca(models.Model):
+    """
+    Texto pesquisável de um orçamento, mantido pelos signals (orcamentos.busca).
+    No SQLite é espelhado numa tabela FTS5; no MySQL tem um índice FULLTEXT.
+    """
+    orcamento = models.OneToOneField(Orcamento, on_delete=models.CASCADE, primary_key=True, related_name='indice_busca')
+    cliente = models.CharField(max_length=100, blank=True)
+    telefone = models.CharField(max_length=50, blank=True) # como cadastrado + só os dígitos
+    observacoes = models.TextField(blank=True)
+    itens = models.TextField(blank=True) # nomes e descrições dos itens
+
+    def __str__(self):
+        return f"Índice de busca do orçamento #{self.orcamento_id}"
+
+    class Meta:
+        verbose_name = "Índice de Busca"
+        verbose_name_plural = "Índices de Busca"
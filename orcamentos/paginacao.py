@@ -0,0 +1,201 @@
+"""
+Paginação por cursor (keyset) das listas de orçamentos e clientes.
+
+Em vez de OFFSET, cada página guarda no link os valores das chaves de ordenação
+da linha de borda (a última para a próxima página, a primeira para a anterior) e
+a consulta seguinte continua a partir deles com um WHERE, que o banco resolve
+pelo índice. Por isso a página 200 custa o mesmo que a primeira, e orçamentos
+criados enquanto o usuário navega não empurram linhas para a página seguinte.
+
+As chaves seguem a sintaxe do order_by ('-data_criacao', '-id') e a última
+precisa ser única (o id), para desempatar. Campos em `nulos` podem ser NULL e
+ficam sempre no fim da lista.
+
+A contagem total e os agregados do filtro (COUNT/SUM sobre todas as linhas) são a
+parte da listagem que cresce com a tabela; com PAGINACAO_CONTAGEM = 'cache' eles
+são reaproveitados por PAGINACAO_CONTAGEM_TTL segundos e com 'nenhuma' a
+contagem de clientes não é feita.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Count, F, Q
+
+
+def _valor_json(valor):
+    # isoformat completo: o DjangoJSONEncoder corta os microssegundos e o cursor deixaria de casar
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f'Valor de cursor não serializável: {valor!r}')
+
+
+def _codificar(dados):
+    texto = json.dumps(dados, default=_valor_json, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _decodificar(cursor):
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        dados = json.loads(texto)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return dados if isinstance(dados, dict) else None
+
+
+class PaginaCursor:
+    """Página de uma listagem por cursor, com a mesma interface de navegação do Page do Django"""
+    por_cursor = True
+
+    def __init__(self, objetos, cursor_anterior, cursor_proximo, cursor_ultima):
+        self.object_list = objetos
+        self.cursor_anterior = cursor_anterior
+        self.cursor_proximo = cursor_proximo
+        self.cursor_ultima = cursor_ultima
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_next(self):
+        return self.cursor_proximo is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+def _ordem(chaves, nulos, para_tras):
+    ordem = []
+    for campo, decrescente in chaves:
+        decrescente = decrescente != para_tras
+        if campo in nulos:
+            # Nulos no fim indo para frente; voltando, a ordem inteira se inverte
+            expressao = F(campo).desc if decrescente else F(campo).asc
+            ordem.append(expressao(**{'nulls_first' if para_tras else 'nulls_last': True}))
+        else:
+            ordem.append(f"{'-' if decrescente else ''}{campo}")
+    return ordem
+
+
+def _continuacao(chaves, valores, nulos, para_tras):
+    """Q das linhas que vêm depois (ou antes, `para_tras`) da linha com `valores`"""
+    partes, iguais = [], Q()
+    for (campo, decrescente), valor in zip(chaves, valores):
+        if valor is None:
+            # Os nulos ficam no fim: antes de um nulo vem qualquer valor preenchido
+            if para_tras:
+                partes.append(iguais & Q(**{f'{campo}__isnull': False}))
+            iguais &= Q(**{f'{campo}__isnull': True})
+            continue
+        maior = decrescente == para_tras
+        passo = Q(**{f"{campo}__{'gt' if maior else 'lt'}": valor})
+        if campo in nulos and not para_tras:
+            passo |= Q(**{f'{campo}__isnull': True})
+        partes.append(iguais & passo)
+        iguais &= Q(**{campo: valor})
+    return reduce(or_, partes)
+
+
+def _limite(chaves, valores, nulos, para_tras):
+    """
+    Limite redundante na primeira chave (data_criacao <= X), que deixa o banco
+    começar a leitura do índice já no ponto certo em vez de filtrar desde o início
+    """
+    (campo, decrescente), valor = chaves[0], valores[0]
+    if valor is None or campo in nulos:
+        return Q()
+    return Q(**{f"{campo}__{'gte' if decrescente == para_tras else 'lte'}": valor})
+
+
+def paginar_por_cursor(queryset, chaves, cursor=None, por_pagina=20, nulos=()):
+    """
+    Uma página de `queryset` ordenado por `chaves`, a partir de `cursor` (o valor
+    de cursor_proximo/cursor_anterior/cursor_ultima de uma página anterior; vazio
+    ou inválido volta para a primeira página)
+    """
+    chaves = [(chave.lstrip('-'), chave.startswith('-')) for chave in chaves]
+    assinatura = ','.join(f"{'-' if decrescente else ''}{campo}" for campo, decrescente in chaves)
+
+    dados = _decodificar(cursor) if cursor else None
+    # Cursor de outra ordenação (o usuário trocou o filtro e manteve o link) é ignorado
+    if dados is None or dados.get('o') != assinatura:
+        dados = {}
+    para_tras = bool(dados.get('t'))
+    valores = dados.get('v')
+
+    linhas = queryset.order_by(*_ordem(chaves, nulos, para_tras))
+    if isinstance(valores, list) and len(valores) == len(chaves):
+        try:
+            linhas = linhas.filter(_limite(chaves, valores, nulos, para_tras),
+                                   _continuacao(chaves, valores, nulos, para_tras))
+        except (ValidationError, ValueError, TypeError):
+            linhas, valores = queryset.order_by(*_ordem(chaves, nulos, False)), None
+            para_tras = False
+    else:
+        valores = None
+
+    # Uma linha a mais só para saber se existe outra página naquela direção
+    objetos = list(linhas[:por_pagina + 1])
+    mais = len(objetos) > por_pagina
+    objetos = objetos[:por_pagina]
+    if para_tras:
+        objetos.reverse()
+
+    def cursor_de(objeto, para_tras):
+        valores_objeto = [getattr(objeto, campo) for campo, _ in chaves]
+        return _codificar({'o': assinatura, 'v': valores_objeto, 't': int(para_tras)})
+
+    # Indo para frente, existe página anterior se veio de um cursor; voltando, se sobrou linha
+    tem_anterior = mais if para_tras else valores is not None
+    tem_proxima = valores is not None if para_tras else mais
+    return PaginaCursor(
+        objetos,
+        cursor_anterior=cursor_de(objetos[0], True) if objetos and tem_anterior else None,
+        cursor_proximo=cursor_de(objetos[-1], False) if objetos and tem_proxima else None,
+        cursor_ultima=_codificar({'o': assinatura, 't': 1}),
+    )
+
+
+def agregar(queryset, **agregados):
+    """
+    queryset.aggregate(**agregados); com PAGINACAO_CONTAGEM = 'cache' o resultado
+    é guardado por PAGINACAO_CONTAGEM_TTL segundos, por consulta
+    """
+    consulta = queryset.order_by()
+    if getattr(settings, 'PAGINACAO_CONTAGEM', 'exata') != 'cache':
+        return consulta.aggregate(**agregados)
+    try:
+        sql, parametros = consulta.query.sql_with_params()
+    except EmptyResultSet:
+        return consulta.aggregate(**agregados)
+    assinatura = f'{sql}|{parametros!r}|{sorted(agregados.items())!r}'
+    chave = 'agregado:' + hashlib.sha1(assinatura.encode()).hexdigest()
+    return cache.get_or_set(
+        chave, lambda: consulta.aggregate(**agregados), getattr(settings, 'PAGINACAO_CONTAGEM_TTL', 60)
+    )
+
+
+def contar(queryset):
+    """
+    Total de linhas do filtro conforme PAGINACAO_CONTAGEM: 'exata' (COUNT a cada
+    requisição), 'cache' (ver agregar) ou 'nenhuma' (devolve None)
+    """
+    if getattr(settings, 'PAGINACAO_CONTAGEM', 'exata') == 'nenhuma':
+        return None
+    return agregar(queryset, total=Count('pk'))['total']
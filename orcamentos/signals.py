@@ -0,0 +1,81 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .busca import agendar_indexacao
+from .documentos import descartar_arquivos
+from .models import (
+    Cliente, Item, Orcamento, OrcamentoItem, DocumentoGerado, ImagemDocumento, itens_em_substituicao,
+)
+
+# Campos do orçamento que entram no índice de busca
+CAMPOS_BUSCA = {'cliente', 'cliente_id', 'observacoes'}
+
+
+@receiver(post_save, sender=OrcamentoItem)
+@receiver(post_delete, sender=OrcamentoItem)
+def atualizar_totais_orcamento(sender, instance, origin=None, **kwargs):
+    """Mantém subtotal/total/saldo do orçamento em dia quando um item muda"""
+    # Exclusões em cascata de orçamento, cliente ou empresa (inclusive por queryset)
+    # levam o orçamento junto: não há total a recalcular
+    modelo_origem = getattr(origin, 'model', type(origin))
+    if origin is not None and modelo_origem not in (OrcamentoItem, Item):
+        return
+    # substituir_itens() recalcula uma vez só, depois de trocar todas as linhas
+    if itens_em_substituicao(instance.orcamento_id):
+        return
+
+    # Reaproveita a instância da view (se houver) para que ela também veja os novos totais
+    if OrcamentoItem.orcamento.is_cached(instance):
+        orcamento = instance.orcamento
+    else:
+        orcamento = Orcamento.objects.filter(pk=instance.orcamento_id).first()
+    if orcamento is not None:
+        orcamento.recalcular_totais()
+
+
+@receiver(post_delete, sender=DocumentoGerado)
+@receiver(post_delete, sender=ImagemDocumento)
+def descartar_arquivo_documento(sender, instance, **kwargs):
+    """Agenda a remoção do arquivo de um documento que saiu do cache"""
+    descartar_arquivos(instance.arquivo.name)
+
+
+@receiver(post_delete, sender=Orcamento)
+def descartar_arquivos_orcamento(sender, instance, **kwargs):
+    descartar_arquivos(instance.pdf.name, instance.png.name)
+
+
+@receiver(post_save, sender=Orcamento)
+def indexar_orcamento(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Mantém o índice de busca do orçamento (saves só de totais/status não mexem nele)"""
+    if raw or (update_fields is not None and not CAMPOS_BUSCA & set(update_fields)):
+        return
+    agendar_indexacao([instance.pk])
+
+
+@receiver(post_save, sender=OrcamentoItem)
+@receiver(post_delete, sender=OrcamentoItem)
+def indexar_itens_orcamento(sender, instance, origin=None, raw=False, **kwargs):
+    # Exclusões em cascata de orçamento, cliente ou empresa levam o orçamento junto
+    modelo_origem = getattr(origin, 'model', type(origin))
+    if raw or (origin is not None and modelo_origem not in (OrcamentoItem, Item)):
+        return
+    if itens_em_substituicao(instance.orcamento_id):
+        return
+    agendar_indexacao([instance.orcamento_id])
+
+
+@receiver(post_save, sender=Cliente)
+def indexar_orcamentos_cliente(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    agendar_indexacao(instance.orcamentos.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Item)
+def indexar_orcamentos_item(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    agendar_indexacao(
+        OrcamentoItem.objects.filter(item=instance).values_list('orcamento_id', flat=True).distinct()
+    )
@@ -0,0 +1,180 @@
+"""
+Componentes de fluxo dos PDFs (ReportLab): cursor de página, parágrafos que
+continuam na página seguinte e tabela que quebra entre páginas.
+
+A tabela mede todas as linhas (quebra de texto e altura) e planeja as quebras
+de página numa única passada antes de desenhar. O cabeçalho se repete em cada
+página e um bloco final (os totais) é mantido junto da última linha, então o
+custo do layout é linear no tamanho do documento.
+"""
+from dataclasses import dataclass, field
+from typing import List
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.units import mm
+
+from .texto import medidor, quebrar_linhas
+
+# Topo útil das páginas de continuação (distância do topo da folha) e limite acima do rodapé
+MARGEM_SUPERIOR = 40
+MARGEM_INFERIOR = 40
+ALTURA_CABECALHO = 20
+
+
+class Pagina:
+    """Cursor vertical do documento; quebra a página quando o próximo bloco não cabe"""
+
+    def __init__(self, c, altura_folha, y, ao_quebrar=None):
+        self.c = c
+        self.topo = altura_folha - MARGEM_SUPERIOR
+        self.base = MARGEM_INFERIOR
+        self.y = y
+        self.ao_quebrar = ao_quebrar
+
+    def cabe(self, altura):
+        return self.y - altura >= self.base
+
+    def quebrar(self):
+        # O rodapé (ao_quebrar) fecha a página atual antes de começar a próxima
+        if self.ao_quebrar:
+            self.ao_quebrar(self.c)
+        self.c.showPage()
+        self.y = self.topo
+
+    def garantir(self, altura):
+        """Começa uma página nova se um bloco que precisa ficar inteiro não cabe mais nesta"""
+        if not self.cabe(altura):
+            self.quebrar()
+
+
+def desenhar_paragrafos(pagina, paragrafos, x, largura, cor, fonte="Helvetica", tamanho=8,
+                        entrelinha=4 * mm, espaco_paragrafo=0):
+    """Quebra os parágrafos na largura e desenha linha a linha, seguindo para a próxima página quando preciso"""
+    medida = medidor(fonte, tamanho)
+    c = pagina.c
+    c.setFillColor(HexColor(cor))
+    c.setFont(fonte, tamanho)
+    for paragrafo in paragrafos:
+        for linha in quebrar_linhas(paragrafo, largura, medida) or ['']:
+            if pagina.y < pagina.base:
+                pagina.quebrar()
+                c.setFillColor(HexColor(cor))
+                c.setFont(fonte, tamanho)
+            c.drawString(x, pagina.y, linha)
+            pagina.y -= entrelinha
+        pagina.y -= espaco_paragrafo
+
+
+@dataclass(frozen=True)
+class Coluna:
+    titulo: str
+    proporcao: float
+    # 'esquerda' quebra o texto em várias linhas; 'centro' é uma linha só
+    alinhamento: str = 'centro'
+
+
+@dataclass
+class LinhaTabela:
+    celulas: List[List[str]]
+    altura: float
+
+
+@dataclass
+class TabelaFluida:
+    """Tabela com linhas de altura variável que flui por quantas páginas precisar"""
+    colunas: List[Coluna]
+    x: float
+    largura: float
+    cores: dict
+    fonte: str = "Helvetica"
+    fonte_titulo: str = "Helvetica-Bold"
+    tamanho: int = 8
+    altura_minima: float = 7 * mm
+    entrelinha: float = 3 * mm
+    recuo: float = 3 * mm
+    linhas: List[LinhaTabela] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.larguras = [self.largura * coluna.proporcao for coluna in self.colunas]
+        self.posicoes = [self.x]
+        for largura in self.larguras[:-1]:
+            self.posicoes.append(self.posicoes[-1] + largura)
+        self._medidor = medidor(self.fonte, self.tamanho)
+
+    def adicionar(self, *valores):
+        """Mede a linha no momento em que entra na tabela (quebra de texto e altura)"""
+        celulas = []
+        for coluna, largura, valor in zip(self.colunas, self.larguras, valores):
+            texto = str(valor)
+            if coluna.alinhamento == 'esquerda':
+                celulas.append(quebrar_linhas(texto, largura - 2 * self.recuo, self._medidor) or [''])
+            else:
+                celulas.append([texto])
+        maior = max(len(linhas) for linhas in celulas)
+        altura = max(self.altura_minima, maior * self.entrelinha + 2 * mm)
+        self.linhas.append(LinhaTabela(celulas, altura))
+
+    def planejar(self, y, topo, base, altura_final=0):
+        """
+        Distribui as linhas pelas páginas a partir de y, antes de desenhar qualquer coisa.
+        Se o bloco final (altura_final) não couber depois da última linha, essa linha
+        desce junto com ele para a página seguinte.
+        """
+        paginas = [[]]
+        y -= ALTURA_CABECALHO
+        for linha in self.linhas:
+            # A primeira página pode ficar sem linhas se a tabela começa muito embaixo
+            if y - linha.altura < base and (paginas[-1] or len(paginas) == 1):
+                paginas.append([])
+                y = topo - ALTURA_CABECALHO
+            paginas[-1].append(linha)
+            y -= linha.altura
+
+        if altura_final and y - altura_final < base and len(paginas[-1]) > 1:
+            paginas.append([paginas[-1].pop()])
+        return paginas
+
+    def desenhar(self, pagina, altura_final=0):
+        """Desenha a tabela a partir de pagina.y, repetindo o cabeçalho em cada página"""
+        paginas = self.planejar(pagina.y, pagina.topo, pagina.base, altura_final)
+        indice = 0
+        for numero, linhas in enumerate(paginas):
+            if numero:
+                pagina.quebrar()
+            if not linhas and self.linhas:
+                continue
+            self._desenhar_cabecalho(pagina.c, pagina.y)
+            pagina.y -= ALTURA_CABECALHO
+            for linha in linhas:
+                self._desenhar_linha(pagina.c, pagina.y, linha, zebra=indice % 2 == 0)
+                pagina.y -= linha.altura
+                indice += 1
+
+    def _desenhar_cabecalho(self, c, y):
+        c.setFillColor(HexColor(self.cores["primary"]))
+        c.roundRect(self.x, y - 8, self.largura, 10 * mm, 3 * mm, stroke=0, fill=1)
+        c.setFillColor(HexColor("#FFFFFF"))
+        c.setFont(self.fonte_titulo, self.tamanho)
+        for coluna, posicao, largura in zip(self.colunas, self.posicoes, self.larguras):
+            if coluna.alinhamento == 'esquerda':
+                c.drawString(posicao + self.recuo, y + 3, coluna.titulo)
+            else:
+                c.drawCentredString(posicao + largura / 2, y + 3, coluna.titulo)
+
+    def _desenhar_linha(self, c, y, linha, zebra):
+        # Fundo alternado para linhas
+        if zebra:
+            c.setFillColor(HexColor(self.cores["light"]))
+            c.roundRect(self.x, y - linha.altura + 2, self.largura, linha.altura, 2 * mm, stroke=0, fill=1)
+
+        c.setFillColor(HexColor(self.cores["dark"]))
+        c.setFont(self.fonte, self.tamanho)
+        centro = y - linha.altura / 2 + 2
+        for coluna, posicao, largura, textos in zip(self.colunas, self.posicoes, self.larguras, linha.celulas):
+            # Bloco de texto centralizado verticalmente na faixa da linha
+            primeira = centro + (len(textos) - 1) * self.entrelinha / 2 - self.tamanho * 0.35
+            for j, texto in enumerate(textos):
+                if coluna.alinhamento == 'esquerda':
+                    c.drawString(posicao + self.recuo, primeira - j * self.entrelinha, texto)
+                else:
+                    c.drawCentredString(posicao + largura / 2, primeira - j * self.entrelinha, texto)
@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from accounts.models import Empresa
+from orcamentos.models import Cliente, Item, Orcamento
+
+
+def criar_orcamento(empresa, cliente, **campos):
+    campos.setdefault('endereco', 'Rua A, 1')
+    return Orcamento.objects.create(empresa=empresa, cliente=cliente, **campos)
+
+
+def updates_de_orcamento(consultas):
+    return [c['sql'] for c in consultas.captured_queries if c['sql'].startswith('UPDATE "orcamentos_orcamento"')]
+
+
+class DadosBaseMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(nome='Empresa Teste')
+        cls.cliente = Cliente.objects.create(empresa=cls.empresa, nome='Ana Silva', telefone='(11) 91234-5678')
+        cls.pula_pula = Item.objects.create(
+            empresa=cls.empresa, nome='Pula-pula', descricao='Pula-pula grande', valor_unitario=Decimal('200.00'),
+        )
+        cls.algodao = Item.objects.create(
+            empresa=cls.empresa, nome='Algodão doce', descricao='Máquina de algodão', valor_unitario=Decimal('50.00'),
+        )
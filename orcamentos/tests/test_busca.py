@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from orcamentos.busca import buscar
+from orcamentos.models import Cliente, IndiceBusca, Orcamento, OrcamentoItem
+from .base import DadosBaseMixin, criar_orcamento
+
+
+class BuscaTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # O índice é refeito no commit
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.orcamento = criar_orcamento(cls.empresa, cls.cliente, observacoes='Festa no salão')
+            OrcamentoItem.objects.create(orcamento=cls.orcamento, item=cls.algodao, quantidade=1, valor=Decimal('50'))
+            outro = Cliente.objects.create(empresa=cls.empresa, nome='Bruno Costa', telefone='(21) 99999-0000')
+            cls.outro = criar_orcamento(cls.empresa, outro)
+
+    def encontrados(self, texto):
+        return set(buscar(Orcamento.objects.filter(empresa=self.empresa), texto).values_list('pk', flat=True))
+
+    def test_prefixo_de_cada_termo(self):
+        self.assertEqual(self.encontrados('ana sil'), {self.orcamento.pk})
+        self.assertEqual(self.encontrados('bru'), {self.outro.pk})
+
+    def test_sem_acento_e_sem_caixa(self):
+        self.assertEqual(self.encontrados('ALGODAO'), {self.orcamento.pk})
+        self.assertEqual(self.encontrados('salao'), {self.orcamento.pk})
+
+    def test_telefone_so_com_digitos(self):
+        self.assertEqual(self.encontrados('11912345678'), {self.orcamento.pk})
+
+    def test_indice_acompanha_o_cliente(self):
+        self.cliente.nome = 'Carla Souza'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cliente.save()
+        self.assertEqual(self.encontrados('carla'), {self.orcamento.pk})
+        self.assertEqual(self.encontrados('ana'), set())
+
+    def test_varias_linhas_na_transacao_reindexam_uma_vez(self):
+        tabela = IndiceBusca._meta.db_table
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                for _ in range(5):
+                    OrcamentoItem.objects.create(
+                        orcamento=self.orcamento, item=self.pula_pula, quantidade=1, valor=Decimal('200'),
+                    )
+                self.orcamento.itens.filter(item=self.algodao).delete()
+        exclusoes = [c for c in consultas.captured_queries if c['sql'].startswith(f'DELETE FROM "{tabela}"')]
+        self.assertEqual(len(exclusoes), 1)
+        self.assertEqual(self.encontrados('pula'), {self.orcamento.pk})
+        self.assertEqual(self.encontrados('algodao'), set())
@@ -0,0 +1,181 @@
+import io
+import shutil
+import sys
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from orcamentos.contexto import orcamento_para_dict
+from orcamentos.checks import verificar_rasterizacao
+from orcamentos.documentos import (
+    _reservar_proxima_tarefa, chave_documento, enfileirar_documento, liberar_tarefas_presas, obter_imagem, obter_pdf,
+    processar_proxima_tarefa, status_documento,
+)
+from orcamentos.models import DocumentoGerado, Orcamento, OrcamentoItem, TarefaDocumento
+from .base import DadosBaseMixin, criar_orcamento
+
+
+class ChaveDocumentoTests(DadosBaseMixin, TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.orcamento = criar_orcamento(self.empresa, self.cliente)
+        OrcamentoItem.objects.create(orcamento=self.orcamento, item=self.pula_pula, quantidade=1, valor=Decimal('200'),
+                                     desconto=Decimal('0'))
+
+    def test_chave_ignora_data_de_emissao(self):
+        dados = orcamento_para_dict(self.orcamento)
+        self.assertEqual(
+            chave_documento(self.orcamento, dados=dados),
+            chave_documento(self.orcamento, dados=dict(dados, data_emissao='01/01/2099')),
+        )
+
+    def test_segundo_download_usa_o_cache(self):
+        with override_settings(MEDIA_ROOT=self.media), \
+                mock.patch('orcamentos.documentos.renderizar_pdf', return_value=b'%PDF-teste') as renderizar:
+            primeiro = obter_pdf(Orcamento.objects.get(pk=self.orcamento.pk))
+            segundo = obter_pdf(Orcamento.objects.get(pk=self.orcamento.pk))
+        self.assertEqual(renderizar.call_count, 1)
+        self.assertEqual(primeiro.pk, segundo.pk)
+        self.assertEqual(DocumentoGerado.objects.filter(orcamento=self.orcamento).count(), 1)
+
+    def test_mudanca_no_orcamento_gera_outra_chave(self):
+        antes = chave_documento(self.orcamento)
+        OrcamentoItem.objects.create(orcamento=self.orcamento, item=self.algodao, quantidade=2, valor=Decimal('50'),
+                                     desconto=Decimal('0'))
+        self.assertNotEqual(chave_documento(Orcamento.objects.get(pk=self.orcamento.pk)), antes)
+
+
+@override_settings(DOCUMENTOS_FILA=True, DOCUMENTOS_FILA_MAX_TENTATIVAS=2)
+class FilaDocumentosTests(DadosBaseMixin, TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        renderizar = mock.patch('orcamentos.documentos.renderizar_pdf', return_value=b'%PDF-teste')
+        renderizar.start()
+        self.addCleanup(renderizar.stop)
+
+        orcamento = criar_orcamento(self.empresa, self.cliente)
+        OrcamentoItem.objects.create(orcamento=orcamento, item=self.pula_pula, quantidade=1, valor=Decimal('200'),
+                                     desconto=Decimal('0'))
+        # Como nas views: a chave do documento vem do orçamento lido do banco
+        self.orcamento = Orcamento.objects.get(pk=orcamento.pk)
+
+    def test_enfileirar_processar_e_ficar_pronto(self):
+        tarefa = enfileirar_documento(self.orcamento)
+        self.assertEqual(enfileirar_documento(self.orcamento), tarefa)
+        self.assertEqual(status_documento(self.orcamento), 'renderizando')
+
+        processada = processar_proxima_tarefa()
+        self.assertEqual((processada.pk, processada.status, processada.tentativas), (tarefa.pk, 'concluida', 1))
+        self.assertEqual(status_documento(self.orcamento), 'pronto')
+        self.assertIsNone(processar_proxima_tarefa())
+
+    def test_erro_volta_para_a_fila_ate_o_limite_de_tentativas(self):
+        enfileirar_documento(self.orcamento)
+        with mock.patch('orcamentos.documentos.obter_pdf', side_effect=RuntimeError('sem fonte')):
+            primeira = processar_proxima_tarefa()
+            self.assertEqual((primeira.status, primeira.erro), ('pendente', 'sem fonte'))
+            segunda = processar_proxima_tarefa()
+        self.assertEqual((segunda.status, segunda.tentativas), ('erro', 2))
+        self.assertIsNone(processar_proxima_tarefa())
+        self.assertEqual(status_documento(self.orcamento), 'erro')
+
+    def test_tarefa_presa_volta_para_a_fila(self):
+        tarefa = enfileirar_documento(self.orcamento)
+        _reservar_proxima_tarefa()
+        self.assertEqual(liberar_tarefas_presas(minutos=10), 0)
+        TarefaDocumento.objects.filter(pk=tarefa.pk).update(atualizada_em=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(liberar_tarefas_presas(minutos=10), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, 'pendente')
+
+    def test_tarefa_reservada_por_outro_worker_nao_e_pega_de_novo(self):
+        disputada = enfileirar_documento(self.orcamento)
+        outra = enfileirar_documento(criar_orcamento(self.empresa, self.cliente))
+        first = QuerySet.first
+
+        def outro_worker_reserva_antes(queryset):
+            tarefa = first(queryset)
+            if tarefa is not None and tarefa.pk == disputada.pk and tarefa.status == 'pendente':
+                # Outro worker leu a mesma tarefa e fez o UPDATE primeiro
+                TarefaDocumento.objects.filter(pk=tarefa.pk).update(status='processando')
+            return tarefa
+
+        with mock.patch.object(QuerySet, 'first', autospec=True, side_effect=outro_worker_reserva_antes):
+            reservada = _reservar_proxima_tarefa()
+        self.assertEqual(reservada.pk, outra.pk)
+        disputada.refresh_from_db()
+        self.assertEqual((disputada.status, disputada.tentativas), ('processando', 0))
+
+    def test_comando_esvazia_a_fila(self):
+        enfileirar_documento(self.orcamento)
+        saida = io.StringIO()
+        call_command('processar_documentos', '--uma-vez', '--coleta-horas', '0', stdout=saida)
+        self.assertIn(f'Orçamento #{self.orcamento.pk}: Concluída', saida.getvalue())
+        self.assertEqual(status_documento(self.orcamento), 'pronto')
+        self.assertFalse(TarefaDocumento.objects.filter(status='pendente').exists())
+
+
+@override_settings(DOCUMENTOS_IMAGEM_DPI=150)
+class ImagemDocumentoTests(DadosBaseMixin, TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        renderizar = mock.patch('orcamentos.documentos.renderizar_pdf', return_value=b'%PDF-teste')
+        renderizar.start()
+        self.addCleanup(renderizar.stop)
+        # pdf2image/poppler não precisam estar instalados: o módulo é trocado por um falso
+        self.convert_from_bytes = mock.Mock(return_value=[Image.new('RGB', (10, 10), 'white')])
+        modulos = mock.patch.dict(sys.modules, {'pdf2image': mock.Mock(convert_from_bytes=self.convert_from_bytes)})
+        modulos.start()
+        self.addCleanup(modulos.stop)
+
+        self.orcamento = criar_orcamento(self.empresa, self.cliente)
+        OrcamentoItem.objects.create(orcamento=self.orcamento, item=self.pula_pula, quantidade=1, valor=Decimal('200'),
+                                     desconto=Decimal('0'))
+
+    def dpi_rasterizado(self):
+        return self.convert_from_bytes.call_args.kwargs['dpi']
+
+    def test_dpi_limitado_a_faixa_aceita(self):
+        for pedido, esperado in (('1000', 300), ('10', 72), ('abc', 150), (None, 150), ('200', 200)):
+            with self.subTest(dpi=pedido):
+                imagem = obter_imagem(self.orcamento, dpi=pedido)
+                self.assertEqual(imagem.dpi, esperado)
+                self.assertEqual(self.dpi_rasterizado(), esperado)
+
+    def test_formato_fora_da_lista_vira_png(self):
+        imagem = obter_imagem(self.orcamento, formato='gif')
+        self.assertEqual(imagem.formato, 'png')
+        with imagem.arquivo.open('rb') as arquivo:
+            self.assertTrue(arquivo.read().startswith(b'\x89PNG'))
+
+    def test_jpeg(self):
+        imagem = obter_imagem(self.orcamento, formato='jpeg')
+        with imagem.arquivo.open('rb') as arquivo:
+            self.assertTrue(arquivo.read().startswith(b'\xff\xd8'))
+
+    def test_mesma_pagina_nao_e_rasterizada_de_novo(self):
+        primeira = obter_imagem(self.orcamento, pagina=1, dpi=100)
+        self.assertEqual(obter_imagem(self.orcamento, pagina=1, dpi=100).pk, primeira.pk)
+        self.assertEqual(self.convert_from_bytes.call_count, 1)
+
+    def test_aviso_sem_poppler(self):
+        with mock.patch('orcamentos.documentos.shutil.which', return_value=None):
+            self.assertEqual([aviso.id for aviso in verificar_rasterizacao(None)], ['orcamentos.W002'])
+        with mock.patch('orcamentos.documentos.shutil.which', return_value='/usr/bin/pdftoppm'):
+            self.assertEqual(verificar_rasterizacao(None), [])
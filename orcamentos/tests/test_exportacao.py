@@ -0,0 +1,65 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+import pikepdf
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Usuario
+from orcamentos.models import OrcamentoItem
+from .base import DadosBaseMixin, criar_orcamento
+
+
+def contar_paginas(pdf):
+    with pikepdf.Pdf.open(io.BytesIO(pdf)) as documento:
+        return len(documento.pages)
+
+
+@override_settings(EXPORTACAO_PROCESSOS_WEB=1)
+class ExportacaoTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+        cls.orcamentos = [
+            criar_orcamento(cls.empresa, cls.cliente, data_evento=date(2026, 6, dia), status=status)
+            for dia, status in ((1, 'pendente'), (2, 'confirmado'), (3, 'pendente'))
+        ]
+        for orcamento in cls.orcamentos:
+            OrcamentoItem.objects.create(orcamento=orcamento, item=cls.pula_pula, quantidade=1,
+                                         valor=Decimal('200'), desconto=Decimal('0'))
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.client.force_login(self.usuario)
+
+    def exportar(self, formato):
+        resposta = self.client.get(reverse('orcamentos:exportar_orcamentos'), {'formato': formato})
+        self.assertEqual(resposta.status_code, 200)
+        return b''.join(resposta.streaming_content)
+
+    def test_zip_tem_um_pdf_por_orcamento(self):
+        with zipfile.ZipFile(io.BytesIO(self.exportar('zip'))) as arquivo_zip:
+            nomes = arquivo_zip.namelist()
+            for nome in nomes:
+                self.assertTrue(arquivo_zip.read(nome).startswith(b'%PDF'))
+        primeiro, confirmado, terceiro = (orcamento.pk for orcamento in self.orcamentos)
+        self.assertEqual(nomes, [
+            f'{primeiro}_orcamento_ana-silva.pdf',
+            f'{confirmado}_confirmacao_ana-silva.pdf',
+            f'{terceiro}_orcamento_ana-silva.pdf',
+        ])
+
+    def test_pdf_unico_junta_as_paginas_de_todos(self):
+        with zipfile.ZipFile(io.BytesIO(self.exportar('zip'))) as arquivo_zip:
+            paginas = sum(contar_paginas(arquivo_zip.read(nome)) for nome in arquivo_zip.namelist())
+        self.assertEqual(contar_paginas(self.exportar('pdf')), paginas)
+        self.assertGreaterEqual(paginas, len(self.orcamentos))
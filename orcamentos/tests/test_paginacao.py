@@ -0,0 +1,68 @@
+from django.db.models import OuterRef, Subquery
+from django.test import TestCase
+
+from orcamentos.models import Cliente, Orcamento
+from orcamentos.paginacao import paginar_por_cursor
+from .base import DadosBaseMixin, criar_orcamento
+
+
+class PaginacaoCursorTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Nomes repetidos para exercitar o desempate pelo id
+        Cliente.objects.bulk_create(
+            Cliente(empresa=cls.empresa, nome=f'Cliente {i % 7}', telefone=str(i)) for i in range(30)
+        )
+        clientes = list(Cliente.objects.order_by('id'))
+        for cliente in clientes[:12]:
+            criar_orcamento(cls.empresa, cliente)
+
+    def percorrer(self, queryset, chaves, por_pagina, nulos=()):
+        """Ids lidos indo até o fim pelo cursor_proximo e voltando da última página pelo cursor_anterior"""
+        frente, pagina = [], paginar_por_cursor(queryset, chaves, None, por_pagina, nulos)
+        frente += [objeto.pk for objeto in pagina]
+        while pagina.has_next():
+            pagina = paginar_por_cursor(queryset, chaves, pagina.cursor_proximo, por_pagina, nulos)
+            frente += [objeto.pk for objeto in pagina]
+
+        pagina = paginar_por_cursor(queryset, chaves, pagina.cursor_ultima, por_pagina, nulos)
+        self.assertFalse(pagina.has_next())
+        tras = [objeto.pk for objeto in pagina]
+        while pagina.has_previous():
+            pagina = paginar_por_cursor(queryset, chaves, pagina.cursor_anterior, por_pagina, nulos)
+            tras = [objeto.pk for objeto in pagina] + tras
+        return frente, tras
+
+    def test_ida_e_volta_com_empates(self):
+        clientes = Cliente.objects.filter(empresa=self.empresa)
+        esperado = list(clientes.order_by('nome', 'id').values_list('pk', flat=True))
+        frente, tras = self.percorrer(clientes, ('nome', 'id'), 4)
+        self.assertEqual(frente, esperado)
+        self.assertEqual(tras, esperado)
+
+    def test_ida_e_volta_decrescente(self):
+        clientes = Cliente.objects.filter(empresa=self.empresa)
+        esperado = list(clientes.order_by('-data_cadastro', '-id').values_list('pk', flat=True))
+        frente, tras = self.percorrer(clientes, ('-data_cadastro', '-id'), 7)
+        self.assertEqual(frente, esperado)
+        self.assertEqual(tras, esperado)
+
+    def test_chave_nula_fica_no_fim(self):
+        clientes = Cliente.objects.filter(empresa=self.empresa).annotate(ultima_data=Subquery(
+            Orcamento.objects.filter(cliente=OuterRef('pk')).order_by('-data_criacao').values('data_criacao')[:1]
+        ))
+        frente, tras = self.percorrer(clientes, ('-ultima_data', '-id'), 5, nulos=('ultima_data',))
+        self.assertEqual(len(frente), clientes.count())
+        self.assertEqual(len(set(frente)), len(frente))
+        self.assertEqual(tras, frente)
+        sem_orcamento = set(clientes.filter(ultima_data__isnull=True).values_list('pk', flat=True))
+        self.assertEqual(set(frente[-len(sem_orcamento):]), sem_orcamento)
+
+    def test_cursor_invalido_volta_para_a_primeira_pagina(self):
+        clientes = Cliente.objects.filter(empresa=self.empresa)
+        primeira = [objeto.pk for objeto in paginar_por_cursor(clientes, ('nome', 'id'), None, 5)]
+        for cursor in ('lixo!!', 'eyJ2IjpbIngiXSwibyI6Im5vbWUsaWQifQ'):
+            pagina = paginar_por_cursor(clientes, ('nome', 'id'), cursor, 5)
+            self.assertEqual([objeto.pk for objeto in pagina], primeira)
+            self.assertFalse(pagina.has_previous())
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from orcamentos.models import Orcamento, OrcamentoItem
+from .base import DadosBaseMixin, criar_orcamento, updates_de_orcamento
+
+
+class TotaisOrcamentoTests(DadosBaseMixin, TestCase):
+    def setUp(self):
+        self.orcamento = criar_orcamento(
+            self.empresa, self.cliente, desconto_geral=Decimal('10'), valor_adicional=Decimal('30'),
+        )
+
+    def adicionar(self, item, quantidade, valor, desconto=None):
+        return OrcamentoItem.objects.create(
+            orcamento=self.orcamento, item=item, quantidade=quantidade, valor=valor, desconto=desconto,
+        )
+
+    def assertTotais(self, subtotal, total):
+        self.orcamento.refresh_from_db()
+        self.assertEqual(self.orcamento.subtotal, Decimal(subtotal))
+        self.assertEqual(self.orcamento.total, Decimal(total))
+
+    def test_incluir_item_recalcula(self):
+        self.adicionar(self.pula_pula, 2, Decimal('200.00'), Decimal('10'))
+        # 2 x 200 - 10% = 360; - 10% geral + 30 = 354
+        self.assertTotais('360.00', '354.00')
+
+    def test_editar_item_recalcula(self):
+        linha = self.adicionar(self.pula_pula, 1, Decimal('200.00'))
+        linha.quantidade = 3
+        linha.save()
+        self.assertTotais('600.00', '570.00')
+
+    def test_excluir_item_recalcula(self):
+        self.adicionar(self.pula_pula, 1, Decimal('200.00'))
+        linha = self.adicionar(self.algodao, 2, Decimal('50.00'))
+        linha.delete()
+        self.assertTotais('200.00', '210.00')
+
+    def test_excluir_item_do_catalogo_recalcula(self):
+        self.adicionar(self.pula_pula, 1, Decimal('200.00'))
+        self.adicionar(self.algodao, 2, Decimal('50.00'))
+        self.algodao.delete()
+        self.assertTotais('200.00', '210.00')
+
+    def test_exclusao_em_cascata_nao_salva_orcamento(self):
+        self.adicionar(self.pula_pula, 1, Decimal('200.00'))
+        self.adicionar(self.algodao, 2, Decimal('50.00'))
+        with CaptureQueriesContext(connection) as consultas:
+            self.cliente.delete()
+        self.assertEqual(updates_de_orcamento(consultas), [])
+        self.assertFalse(Orcamento.objects.filter(pk=self.orcamento.pk).exists())
+
+    def test_exclusao_por_queryset_nao_salva_orcamento(self):
+        self.adicionar(self.pula_pula, 1, Decimal('200.00'))
+        with CaptureQueriesContext(connection) as consultas:
+            Orcamento.objects.filter(pk=self.orcamento.pk).delete()
+        self.assertEqual(updates_de_orcamento(consultas), [])
@@ -0,0 +1,259 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Empresa, Usuario
+from orcamentos.models import Item, Orcamento, OrcamentoItem
+from .base import DadosBaseMixin, criar_orcamento, updates_de_orcamento
+
+
+class EditarOrcamentoTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+        cls.catalogo = [
+            Item.objects.create(empresa=cls.empresa, descricao=f'Item {n}', valor_unitario=Decimal('10.00'),
+                                desconto=Decimal('10'))
+            for n in range(20)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+        self.orcamento = criar_orcamento(self.empresa, self.cliente, data_evento=date(2026, 5, 10))
+        OrcamentoItem.objects.bulk_create(
+            OrcamentoItem(orcamento=self.orcamento, item=item, quantidade=1, valor=item.valor_unitario,
+                          desconto=Decimal('0'))
+            for item in self.catalogo
+        )
+        self.orcamento.recalcular_totais()
+
+    def editar(self, itens):
+        dados = {'data_evento': '2026-05-10', 'endereco': 'Rua B, 2', 'desconto': '0'}
+        dados.update({f'item_{item.pk}': '2' for item in itens})
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.post(reverse('orcamentos:editar_orcamento', args=[self.orcamento.pk]), dados)
+        self.assertEqual(resposta.status_code, 302)
+        return consultas
+
+    def test_consultas_nao_crescem_com_os_itens(self):
+        poucos = len(self.editar(self.catalogo[:2]))
+        muitos = len(self.editar(self.catalogo))
+        self.assertEqual(poucos, muitos)
+
+    def test_orcamento_gravado_uma_vez_com_os_totais_novos(self):
+        consultas = self.editar(self.catalogo)
+        self.assertEqual(len(updates_de_orcamento(consultas)), 1)
+        self.orcamento.refresh_from_db()
+        # 20 x (2 x 10 - 10%)
+        self.assertEqual(self.orcamento.subtotal, Decimal('360.00'))
+        self.assertEqual(self.orcamento.total, Decimal('360.00'))
+        self.assertEqual(self.orcamento.itens.count(), 20)
+
+    def test_item_de_outra_empresa_nao_altera_o_orcamento(self):
+        outro = Item.objects.create(empresa=Empresa.objects.create(nome='Outra'), descricao='X',
+                                    valor_unitario=Decimal('1'))
+        dados = {'data_evento': '2026-05-10', 'endereco': 'Rua B, 2', f'item_{outro.pk}': '1'}
+        resposta = self.client.post(reverse('orcamentos:editar_orcamento', args=[self.orcamento.pk]), dados)
+        self.assertEqual(resposta.status_code, 404)
+        self.assertEqual(self.orcamento.itens.count(), 20)
+
+
+class BaixarImagemTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+        cls.orcamento = criar_orcamento(cls.empresa, cls.cliente)
+
+    def test_sem_poppler_volta_para_o_orcamento_com_aviso(self):
+        self.client.force_login(self.usuario)
+        with mock.patch('orcamentos.views.rasterizacao_disponivel', return_value=False), \
+                mock.patch('orcamentos.views.obter_imagem') as obter_imagem:
+            resposta = self.client.get(reverse('orcamentos:baixar_imagem', args=[self.orcamento.pk]))
+        self.assertRedirects(resposta, reverse('orcamentos:detalhes_orcamento', args=[self.orcamento.pk]),
+                             fetch_redirect_response=False)
+        self.assertFalse(obter_imagem.called)
+        mensagens = [str(m) for m in resposta.wsgi_request._messages]
+        self.assertIn('poppler', mensagens[0])
+
+
+class AgendamentosTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def agendar(self, data, status, quantidade=1):
+        for _ in range(quantidade):
+            orcamento = criar_orcamento(self.empresa, self.cliente, data_evento=data, status=status)
+            OrcamentoItem.objects.create(orcamento=orcamento, item=self.pula_pula, quantidade=1,
+                                         valor=Decimal('200'), desconto=Decimal('0'))
+
+    def abrir(self, mes):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('orcamentos:agendamentos'), {'mes': mes.strftime('%Y-%m')})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta, len(consultas)
+
+    def test_consultas_nao_crescem_com_os_eventos(self):
+        data = timezone.now().date() + timedelta(days=3)
+        self.agendar(data, 'confirmado', 2)
+        _, poucos = self.abrir(data)
+        self.agendar(data, 'confirmado', 6)
+        self.agendar(data + timedelta(days=1), 'pendente', 4)
+        # Confirmados já passados (a concluir) e concluídos recentes também aparecem
+        self.agendar(data - timedelta(days=6), 'confirmado', 3)
+        self.agendar(data - timedelta(days=5), 'concluido', 3)
+        _, muitos = self.abrir(data)
+        self.assertEqual(poucos, muitos)
+
+    def test_lotacao_do_dia_pela_capacidade_da_empresa(self):
+        self.empresa.capacidade_diaria = 2
+        self.empresa.save()
+        cheio, livre = date(2030, 5, 15), date(2030, 5, 16)
+        self.agendar(cheio, 'confirmado')
+        self.agendar(cheio, 'concluido')
+        self.agendar(cheio, 'pendente')
+        self.agendar(cheio, 'cancelado')
+        self.agendar(livre, 'confirmado')
+        self.agendar(livre, 'pendente', 3)
+
+        resposta, _ = self.abrir(cheio)
+        dias = {dia['data']: dia for dia in resposta.context['dias_calendario']}
+        self.assertEqual(
+            {campo: dias['2030-05-15'][campo] for campo in ('ocupados', 'pendentes', 'total_eventos', 'lotado')},
+            {'ocupados': 2, 'pendentes': 1, 'total_eventos': 3, 'lotado': True},
+        )
+        self.assertEqual(
+            {campo: dias['2030-05-16'][campo] for campo in ('ocupados', 'pendentes', 'total_eventos', 'lotado')},
+            {'ocupados': 1, 'pendentes': 3, 'total_eventos': 4, 'lotado': False},
+        )
+        self.assertEqual(dias['2030-05-17']['ocupados'], 0)
+        self.assertFalse(dias['2030-05-17']['lotado'])
+
+
+class ListaItensTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def locar(self, item, status, quantidade, valor, desconto):
+        orcamento = criar_orcamento(self.empresa, self.cliente, data_evento=date(2026, 8, 1), status=status)
+        OrcamentoItem.objects.create(orcamento=orcamento, item=item, quantidade=quantidade,
+                                     valor=Decimal(valor), desconto=Decimal(desconto))
+
+    def listar(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get(reverse('orcamentos:lista_itens'), {'ordenacao': 'faturamento'})
+        self.assertEqual(resposta.status_code, 200)
+        return {item.pk: item for item in resposta.context['itens']}, len(consultas)
+
+    def test_faturamento_com_desconto_da_linha(self):
+        self.locar(self.pula_pula, 'confirmado', 2, '200.00', '10')  # 360
+        self.locar(self.pula_pula, 'concluido', 1, '180.00', '0')  # 180
+        self.locar(self.pula_pula, 'pendente', 5, '200.00', '0')  # não conta
+        self.locar(self.algodao, 'confirmado', 3, '50.00', '50')  # 75
+
+        itens, _ = self.listar()
+        self.assertEqual((itens[self.pula_pula.pk].faturamento, itens[self.pula_pula.pk].uso_count),
+                         (Decimal('540.00'), 2))
+        self.assertEqual((itens[self.algodao.pk].faturamento, itens[self.algodao.pk].uso_count),
+                         (Decimal('75.00'), 1))
+
+    def test_consultas_nao_crescem_com_os_itens(self):
+        self.locar(self.pula_pula, 'confirmado', 1, '200.00', '0')
+        _, poucos = self.listar()
+        for n in range(10):
+            item = Item.objects.create(empresa=self.empresa, descricao=f'Item {n}', valor_unitario=Decimal('10'))
+            self.locar(item, 'confirmado', 1, '10.00', '0')
+        _, muitos = self.listar()
+        self.assertEqual(poucos, muitos)
+
+
+class EstatisticasListaOrcamentosTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+        linhas = (
+            ('pendente', cls.pula_pula, 1, Decimal('10'), Decimal('0')),  # 200 - 10% = 180
+            ('confirmado', cls.algodao, 2, Decimal('0'), Decimal('30')),  # 100 + 30 = 130
+            ('confirmado', cls.pula_pula, 1, Decimal('0'), Decimal('0')),  # 200
+            ('cancelado', cls.algodao, 1, Decimal('0'), Decimal('0')),  # 50
+        )
+        for status, item, quantidade, desconto_geral, adicional in linhas:
+            orcamento = criar_orcamento(cls.empresa, cls.cliente, status=status, desconto_geral=desconto_geral,
+                                        valor_adicional=adicional)
+            OrcamentoItem.objects.create(orcamento=orcamento, item=item, quantidade=quantidade,
+                                         valor=item.valor_unitario, desconto=Decimal('0'))
+        # Orçamento de outra empresa não entra nas contas
+        outra = Empresa.objects.create(nome='Outra')
+        criar_orcamento(outra, cls.cliente, status='confirmado', valor_adicional=Decimal('999'))
+
+    def stats(self, **filtros):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('orcamentos:lista_orcamentos'), filtros)
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.context['stats']
+
+    def test_estatisticas_de_todos(self):
+        self.assertEqual(self.stats(), {'total': 4, 'confirmados': 2, 'pendentes': 1, 'valor_total': '560,00'})
+
+    def test_estatisticas_do_filtro(self):
+        self.assertEqual(self.stats(status='confirmado'),
+                         {'total': 2, 'confirmados': 2, 'pendentes': 0, 'valor_total': '330,00'})
+
+
+class OrdenacaoPorValorTests(DadosBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.usuario = Usuario.objects.create_user('ana', password='senha', empresa=cls.empresa)
+        # 25 orçamentos com só três totais distintos: toda borda de página (10 por página) cai num empate
+        for n in range(25):
+            criar_orcamento(cls.empresa, cls.cliente, valor_adicional=Decimal((100, 250, 400)[n % 3]))
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def pagina(self, sort, cursor=None):
+        parametros = {'sort': sort}
+        if cursor:
+            parametros['cursor'] = cursor
+        return self.client.get(reverse('orcamentos:lista_orcamentos'), parametros).context['page_obj']
+
+    def percorrer(self, sort):
+        pagina = self.pagina(sort)
+        frente = [orcamento.pk for orcamento in pagina]
+        while pagina.has_next():
+            pagina = self.pagina(sort, pagina.cursor_proximo)
+            frente += [orcamento.pk for orcamento in pagina]
+        tras = []
+        while pagina.has_previous():
+            pagina = self.pagina(sort, pagina.cursor_anterior)
+            tras = [orcamento.pk for orcamento in pagina] + tras
+        return frente, tras
+
+    def test_totais_iguais_nao_pulam_nem_repetem_linhas(self):
+        orcamentos = Orcamento.objects.filter(empresa=self.empresa)
+        for sort, ordem in (('valor-maior', ('-total', '-id')), ('valor-menor', ('total', 'id'))):
+            with self.subTest(sort=sort):
+                esperado = list(orcamentos.order_by(*ordem).values_list('pk', flat=True))
+                frente, tras = self.percorrer(sort)
+                self.assertEqual(frente, esperado)
+                # Voltando da última página chega-se ao início sem a última página (já lida)
+                self.assertEqual(tras, esperado[:20])
@@ -0,0 +1,86 @@
+"""
+Medição e quebra de texto compartilhadas pelos renders em PDF (ReportLab) e
+PNG (Pillow).
+
+Larguras são memorizadas por fonte e tamanho: no PDF por caractere (a largura
+de uma string no ReportLab é a soma das larguras dos glifos), no Pillow por
+palavra (preserva o kerning dentro da palavra). A quebra de linha soma as
+larguras das palavras uma única vez, em tempo linear no tamanho do texto.
+"""
+from functools import lru_cache
+
+from reportlab.pdfbase import pdfmetrics
+
+
+class MedidorPDF:
+    """Larguras de texto de uma fonte ReportLab em um tamanho"""
+
+    def __init__(self, fonte, tamanho):
+        self.fonte = fonte
+        self.tamanho = tamanho
+        self._glifos = {}
+
+    def _glifo(self, caractere):
+        largura = self._glifos.get(caractere)
+        if largura is None:
+            largura = self._glifos[caractere] = pdfmetrics.stringWidth(caractere, self.fonte, self.tamanho)
+        return largura
+
+    def largura(self, texto):
+        return sum(self._glifo(caractere) for caractere in texto)
+
+
+class MedidorPIL:
+    """Larguras de texto de uma fonte Pillow (já carregada em um tamanho)"""
+
+    def __init__(self, fonte):
+        self.fonte = fonte
+        self._palavras = {}
+
+    def largura(self, texto):
+        largura = self._palavras.get(texto)
+        if largura is None:
+            if len(self._palavras) > 4096:
+                self._palavras.clear()
+            largura = self._palavras[texto] = self.fonte.getlength(texto)
+        return largura
+
+
+@lru_cache(maxsize=64)
+def medidor_pdf(fonte, tamanho):
+    return MedidorPDF(fonte, tamanho)
+
+
+@lru_cache(maxsize=64)
+def medidor_pil(fonte):
+    return MedidorPIL(fonte)
+
+
+def medidor(fonte, tamanho=None):
+    """Medidor para um nome de fonte ReportLab + tamanho, ou para uma fonte Pillow"""
+    if isinstance(fonte, str):
+        return medidor_pdf(fonte, tamanho)
+    return medidor_pil(fonte)
+
+
+def quebrar_linhas(texto, largura_max, medidor):
+    """Quebra o texto em linhas de até largura_max; uma palavra maior que a linha fica sozinha"""
+    linhas = []
+    atual = []
+    largura_atual = 0.0
+    espaco = medidor.largura(' ')
+
+    for palavra in texto.split():
+        largura_palavra = medidor.largura(palavra)
+        if not atual:
+            atual, largura_atual = [palavra], largura_palavra
+        elif largura_atual + espaco + largura_palavra <= largura_max:
+            atual.append(palavra)
+            largura_atual += espaco + largura_palavra
+        else:
+            linhas.append(' '.join(atual))
+            atual, largura_atual = [palavra], largura_palavra
+
+    if atual:
+        linhas.append(' '.join(atual))
+    return linhas
@@ -0,0 +1,28 @@
+"""
+Trabalho derivado (índice de busca, resumo mensal) adiado para o commit.
+
+Os signals disparam uma vez por linha salva; em vez de refazer o índice ou o
+resumo a cada uma, eles juntam as chaves afetadas e uma única execução roda
+quando a transação é confirmada. Fora de transação roda na hora, como antes.
+"""
+from django.db import transaction
+
+
+def ao_confirmar(nome, chaves, funcao, using=None):
+    """
+    Junta `chaves` às pendentes de `nome` e agenda `funcao(pendentes)` para o
+    commit da transação atual. Várias chamadas na mesma transação resultam numa
+    só execução com todas as chaves; se ela for desfeita, as chaves ficam para
+    o próximo commit (refazer a partir do banco é inofensivo)
+    """
+    conexao = transaction.get_connection(using)
+    pendentes = conexao.__dict__.setdefault('_pendentes_commit', {}).setdefault(nome, set())
+    pendentes.update(chaves)
+
+    def executar():
+        lote = set(pendentes)
+        pendentes.difference_update(lote)
+        if lote:
+            funcao(lote)
+
+    transaction.on_commit(executar, using=using)
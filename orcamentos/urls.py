@@ -6,10 +6,13 @@ app_name = 'orcamentos'
 urlpatterns = [
     path('', views.lista_orcamentos, name='lista_orcamentos'),
     path('novo/', views.novo_orcamento, name='novo_orcamento'),
+    path('exportar/', views.exportar_orcamentos, name='exportar_orcamentos'),
     path('<int:orcamento_id>/', views.detalhes_orcamento, name='detalhes_orcamento'),
     path('<int:orcamento_id>/editar/', views.editar_orcamento, name='editar_orcamento'),
     path('<int:orcamento_id>/excluir/', views.excluir_orcamento, name='excluir_orcamento'),
     path('<int:orcamento_id>/baixar-pdf/', views.baixar_pdf, name='baixar_pdf'),
+    path('<int:orcamento_id>/baixar-pdf/status/', views.status_pdf, name='status_pdf'),
+    path('<int:orcamento_id>/imagem/', views.baixar_imagem, name='baixar_imagem'),
     path('<int:orcamento_id>/alterar-status/', views.alterar_status, name='alterar_status'),
     path('clientes/novo/', views.novo_cliente, name='adicionar_cliente'),
     path('clientes/', views.lista_clientes, name='lista_clientes'),
@@ -22,4 +25,6 @@ urlpatterns = [
     path('itens/', views.lista_itens, name='lista_itens'),
     path('itens/editar/<int:item_id>/', views.editar_item, name='editar_item'),
     path('itens/excluir/<int:item_id>/', views.excluir_item, name='excluir_item'),
+    path('desempenho/', views.desempenho, name='desempenho'),
+    path('desempenho/json/', views.desempenho_json, name='desempenho_json'),
 ]
\ No newline at end of file
@@ -1,23 +1,34 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.http import HttpResponse, JsonResponse, FileResponse
+from django.http import Http404, HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Sum, Count, Max
+from django.db import transaction
+from django.db.models import Q, F, Sum, Count, Max, Value, DecimalField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
 from datetime import timedelta, datetime
-import os
+from decimal import Decimal
 import json
+import tempfile
 
-from .models import Cliente, Item, Orcamento, OrcamentoItem
+from .models import Cliente, Item, Orcamento, OrcamentoItem, expressao_valor_linha
 from accounts.models import Empresa, Usuario
 from .forms import OrcamentoForm, ClienteForm, ItemForm, OrcamentoSearchForm
-from .utils import gerar_arquivos
+from .documentos import (
+    FORMATOS_IMAGEM, abrir_pdf, descartar_documentos_orcamento, documento_pronto, enfileirar_documento, fila_ativa,
+    obter_imagem, rasterizacao_disponivel, status_documento,
+)
+from .busca import buscar
+from .exportacao import exportar_pdf_unico, exportar_zip, orcamentos_para_exportar
+from .instrumentacao import registro
+from .paginacao import agregar, contar, paginar_por_cursor
 
 # Decorator personalizado para verificar se o usuário tem acesso à empresa
 def acesso_empresa_required(view_func):
@@ -57,12 +68,20 @@ def lista_orcamentos(request):
     
     # Obter parâmetros de filtro
     status_filter = request.GET.get('status', 'all')
-    sort_by = request.GET.get('sort', 'recentes')
-    search_query = request.GET.get('q', '')
+    search_query = request.GET.get('q', '').strip()
+    sort_by = request.GET.get('sort', '')
+    # Sem ordenação escolhida: relevância quando há busca, senão os mais recentes
+    ordenacao = sort_by or ('relevancia' if search_query else 'recentes')
     page_number = request.GET.get('page', 1)
+    cursor = request.GET.get('cursor')
     
     # Base query - apenas orçamentos da empresa do usuário
-    orcamentos = Orcamento.objects.filter(empresa=request.user.empresa).select_related("cliente").prefetch_related("itens")
+    # Os itens vêm num único prefetch por página (o card mostra os três primeiros e quantos faltam)
+    orcamentos = (
+        Orcamento.objects.filter(empresa=request.user.empresa)
+        .select_related("cliente")
+        .prefetch_related('itens__item')
+    )
     
     # Aplicar filtro de status
     if status_filter != 'all':
@@ -70,43 +89,39 @@ def lista_orcamentos(request):
     
     # Aplicar busca
     if search_query:
-        orcamentos = orcamentos.filter(
-            Q(cliente__nome__icontains=search_query) |
-            Q(cliente__telefone__icontains=search_query) |
-            Q(observacoes__icontains=search_query) |
-            Q(itens__item__descricao__icontains=search_query)
-        ).distinct()
-    
-    # Aplicar ordenação
-    if sort_by == 'recentes':
-        orcamentos = orcamentos.order_by('-data_criacao')
-    elif sort_by == 'antigos':
-        orcamentos = orcamentos.order_by('data_criacao')
-    elif sort_by == 'valor-maior':
-        orcamentos = orcamentos.annotate(
-            total_calculado=Sum('itens__quantidade') * Sum('itens__item__valor_unitario')
-        ).order_by('-total_calculado')
-    elif sort_by == 'valor-menor':
-        orcamentos = orcamentos.annotate(
-            total_calculado=Sum('itens__quantidade') * Sum('itens__item__valor_unitario')
-        ).order_by('total_calculado')
+        orcamentos = buscar(orcamentos, search_query, ranquear=ordenacao == 'relevancia')
+    
+    # Estatísticas do filtro atual numa única consulta, pelo total gravado em cada orçamento
+    agregados = agregar(
+        orcamentos,
+        quantidade=Count('id'),
+        confirmados=Count('id', filter=Q(status='confirmado')),
+        pendentes=Count('id', filter=Q(status='pendente')),
+        soma=Sum('total'),
+    )
+    valor_total = "{:,.2f}".format(agregados['soma'] or 0).replace(",", "X").replace(".", ",").replace("X", ".")
+    
+    # Aplicar ordenação. Por data e por valor a paginação é por cursor (chaves de ordenação + id);
+    # relevância continua com número de página
+    chaves = None
+    if ordenacao == 'relevancia' and search_query:
+        orcamentos = orcamentos.order_by('-relevancia', '-data_criacao')
+    elif ordenacao in ('recentes', 'relevancia'):
+        chaves = ('-data_criacao', '-id')
+    elif ordenacao == 'antigos':
+        chaves = ('data_criacao', 'id')
+    elif ordenacao == 'valor-maior':
+        # Total persistido (linhas com desconto do item - desconto geral + adicional),
+        # sem JOIN com os itens: não duplica linhas e usa o índice (empresa, total)
+        chaves = ('-total', '-id')
+    elif ordenacao == 'valor-menor':
+        chaves = ('total', 'id')
     
     # Paginação
-    paginator = Paginator(orcamentos, 10)
-    page_obj = paginator.get_page(page_number)
-    
-    # Calcular estatísticas apenas para a empresa do usuário
-    total_orcamentos = orcamentos.count()
-    orcamentos_confirmados = orcamentos.filter(status='confirmado').count()
-    orcamentos_pendentes = orcamentos.filter(status='pendente').count()
-    
-    # Calcular valor total
-    valor_total = 0
-    for orcamento in orcamentos:
-        valor_total += orcamento.total
-        
-    valor_total = float(f"{valor_total:.2f}")
-    valor_total = "{:,.2f}".format(valor_total).replace(",", "X").replace(".", ",").replace("X", ".")
+    if chaves:
+        page_obj = paginar_por_cursor(orcamentos, chaves, cursor, por_pagina=10)
+    else:
+        page_obj = Paginator(orcamentos, 10).get_page(page_number)
     
     context = {
         'orcamentos': page_obj,
@@ -116,9 +131,9 @@ def lista_orcamentos(request):
         'sort_by': sort_by,
         'search_query': search_query,
         'stats': {
-            'total': total_orcamentos,
-            'confirmados': orcamentos_confirmados,
-            'pendentes': orcamentos_pendentes,
+            'total': agregados['quantidade'],
+            'confirmados': agregados['confirmados'],
+            'pendentes': agregados['pendentes'],
             'valor_total': valor_total,
         }
     }
@@ -173,6 +188,34 @@ def detalhes_orcamento(request, orcamento_id):
     
     return render(request, "orcamentos/detalhes_orcamento.html", context)
 
+def _linhas_do_post(request, ignorar_inexistentes=False):
+    """
+    Linhas do orçamento (OrcamentoItem ainda sem orçamento) a partir dos campos
+    item_<id>=<quantidade> do POST, com os itens da empresa buscados numa só
+    consulta. Item de outra empresa ou inexistente dá 404, ou é pulado com
+    `ignorar_inexistentes`
+    """
+    quantidades = {}
+    for key, value in request.POST.items():
+        if not key.startswith("item_") or not value:
+            continue
+        item_id = key.replace("item_", "")
+        try:
+            quantidade = int(value)
+        except ValueError:
+            continue
+        if quantidade > 0 and item_id.isdigit():
+            quantidades[int(item_id)] = quantidade
+
+    itens = Item.objects.filter(empresa=request.user.empresa).in_bulk(list(quantidades))
+    if len(itens) < len(quantidades) and not ignorar_inexistentes:
+        raise Http404("Item não encontrado")
+    return [
+        OrcamentoItem(item=itens[item_id], quantidade=quantidade,
+                      valor=itens[item_id].valor_unitario, desconto=itens[item_id].desconto)
+        for item_id, quantidade in quantidades.items() if item_id in itens
+    ]
+
 @login_required
 def novo_orcamento(request):
     # Filtra clientes e itens apenas da empresa do usuário
@@ -263,62 +306,34 @@ def novo_orcamento(request):
             messages.error(request, "Data do evento é obrigatória")
             return redirect("orcamentos:novo_orcamento")
         
-        # Cria o orçamento na empresa do usuário
-        orcamento = Orcamento.objects.create(
-            cliente=cliente,
-            empresa=request.user.empresa,
-            criado_por=request.user,
-            desconto_geral=desconto,
-            observacoes=obs,
-            data_evento=data_evento,
-            hora_evento=hora_evento,
-            periodo_evento=periodo_evento,
-            tipo_evento=tipo_evento,
-            valor_adicional=valor_adicional,
-            status='pendente',
-            endereco=endereco,
-            valor_pago=valor_pago,
-        )
-
         # Adiciona os itens (já filtrados por empresa)
-        itens_payload = []
-        itens_adicionados = False
-        
-        for key, value in request.POST.items():
-            if key.startswith("item_") and value:
-                try:
-                    quantidade = int(value)
-                    if quantidade > 0:
-                        item_id = key.replace("item_", "")
-                        # Garante que o item pertence à empresa
-                        item = Item.objects.get(id=item_id, empresa=request.user.empresa)
-                        
-                        OrcamentoItem.objects.create(
-                            orcamento=orcamento,
-                            item=item,
-                            quantidade=quantidade,
-                            valor=item.valor_unitario,
-                            desconto=item.desconto                                      
-                        )
-
-                        itens_payload.append({
-                            "descricao": item.descricao,
-                            "quantidade": quantidade,
-                            "valor_unitario": float(item.valor_unitario),
-                            "desconto": float(item.desconto or 0),
-                        })
-                        
-                        itens_adicionados = True
-                        
-                except (ValueError, Item.DoesNotExist) as e:
-                    #print(f"Erro ao processar item {key}: {str(e)}")
-                    continue
+        linhas = _linhas_do_post(request, ignorar_inexistentes=True)
 
         # Verifica se pelo menos um item foi adicionado
-        if not itens_adicionados:
-            orcamento.delete()
+        if not linhas:
             messages.error(request, "É necessário adicionar pelo menos um item ao orçamento")
             return redirect("orcamentos:novo_orcamento")
+
+        # Cria o orçamento na empresa do usuário
+        with transaction.atomic():
+            orcamento = Orcamento.objects.create(
+                cliente=cliente,
+                empresa=request.user.empresa,
+                criado_por=request.user,
+                desconto_geral=desconto,
+                observacoes=obs,
+                data_evento=data_evento,
+                hora_evento=hora_evento,
+                periodo_evento=periodo_evento,
+                tipo_evento=tipo_evento,
+                valor_adicional=valor_adicional,
+                status='pendente',
+                endereco=endereco,
+                valor_pago=valor_pago,
+            )
+            orcamento.substituir_itens(linhas)
+
+        enfileirar_documento(orcamento)
         
         try:
             messages.success(request, f'Orçamento #{orcamento.id} criado com sucesso!')
@@ -453,23 +468,9 @@ def criar_orcamento(request, clientes, itens, itens_json, ignorar_conflito=False
         )
     #print(f"Orçamento criado com ID: {orcamento.id}")
     # Adiciona os itens
-    for key, value in request.POST.items():
-        if key.startswith("item_"):
-            try:
-                quantidade = int(value)
-                if quantidade > 0:
-                    item_id = key.replace("item_", "")
-                    item = get_object_or_404(Item, id=item_id, empresa=request.user.empresa)
-                    OrcamentoItem.objects.create(
-                        orcamento=orcamento,
-                        item=item,
-                        quantidade=quantidade,
-                        valor=item.valor_unitario,
-                        desconto=item.desconto
-                    )
-            except ValueError:
-                pass
+    orcamento.substituir_itens(_linhas_do_post(request))
     #print(f"Orçamento #{orcamento.id} criado com sucesso.")
+    enfileirar_documento(orcamento)
     # Limpa os dados temporários da sessão
     if 'orcamento_temp_data' in request.session:
         del request.session['orcamento_temp_data']
@@ -515,6 +516,9 @@ def editar_orcamento(request, orcamento_id):
         endereco = request.POST.get("endereco", "")
         custo_operacional = float(request.POST.get("custo_operacional", 0) or 0)
         
+        # Itens novos (apenas da empresa), validados antes de mexer no orçamento
+        linhas = _linhas_do_post(request)
+
         # Atualiza o orçamento
         orcamento.desconto_geral = desconto
         orcamento.observacoes = obs
@@ -526,29 +530,13 @@ def editar_orcamento(request, orcamento_id):
         orcamento.valor_adicional = valor_adicional
         orcamento.endereco = endereco
         orcamento.custo_operacional = custo_operacional
-        orcamento.save()
-        
-        # Remove todos os itens atuais
-        orcamento.itens.all().delete()
-        
-        # Adiciona os novos itens (apenas da empresa)
-        for key, value in request.POST.items():
-            if key.startswith("item_"):
-                try:
-                    quantidade = int(value)
-                    if quantidade > 0:
-                        item_id = key.replace("item_", "")
-                        item = get_object_or_404(Item, id=item_id, empresa=request.user.empresa)
-                        OrcamentoItem.objects.create(
-                            orcamento=orcamento,
-                            item=item,
-                            quantidade=quantidade,
-                            valor=item.valor_unitario,
-                            desconto=item.desconto
-                        )
-                except ValueError:
-                    pass
+
+        # Troca os itens e grava o orçamento com os novos totais num só UPDATE
+        with transaction.atomic():
+            orcamento.substituir_itens(linhas, commit=False)
+            orcamento.save()
         
+        enfileirar_documento(orcamento)
         messages.success(request, f'Orçamento #{orcamento.id} atualizado com sucesso!')
         return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento.id)
     
@@ -568,12 +556,7 @@ def excluir_orcamento(request, orcamento_id):
     orcamento = get_object_or_404(Orcamento.objects.filter(empresa=request.user.empresa), id=orcamento_id)
     
     if request.method == "POST":
-        # Excluir arquivos PDF/PNG se existirem
-        if orcamento.pdf and os.path.exists(orcamento.pdf.path):
-            os.remove(orcamento.pdf.path)
-        if orcamento.png and os.path.exists(orcamento.png.path):
-            os.remove(orcamento.png.path)
-        
+        # Os arquivos PDF/PNG vão para a fila de descarte (signal post_delete)
         orcamento.delete()
         messages.success(request, f'Orçamento #{orcamento_id} excluído com sucesso!')
         return redirect("orcamentos:lista_orcamentos")
@@ -583,52 +566,25 @@ def excluir_orcamento(request, orcamento_id):
 @login_required
 @acesso_empresa_required
 def baixar_pdf(request, orcamento_id):
-    orcamento = get_object_or_404(Orcamento.objects.filter(empresa=request.user.empresa), id=orcamento_id)
-    return gerar_e_baixar_pdf(request, orcamento)
-    # Verifica se o campo pdf existe no banco de dados
-    if orcamento.pdf:
-        file_path = orcamento.pdf.path
-        #print(f"Tentando baixar PDF do caminho: {file_path}")
-        
-        # Verifica se o arquivo existe fisicamente
-        if not os.path.exists(file_path):
-            #print("Arquivo PDF não encontrado no sistema de arquivos. Gerando novo PDF.")
-            # Remove a referência ao arquivo que não existe mais
-            orcamento.pdf.delete(save=False)
-            orcamento.save()
-            return gerar_e_baixar_pdf(request, orcamento)
-        
-        try:
-            # Serve o arquivo diretamente
-            filename = f'Orcamento_{orcamento.cliente.nome}.pdf'
-            response = FileResponse(open(file_path, 'rb'), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        except Exception as e:
-            messages.error(request, f'Erro ao baixar o arquivo PDF: {str(e)}')
-            return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento_id)
-    
-    else:
-        # Se o PDF não existe no campo, gera um novo
-        return gerar_e_baixar_pdf(request, orcamento)
-    
-    
-def gerar_e_baixar_pdf(request, orcamento):
+    orcamento = get_object_or_404(
+        Orcamento.objects.filter(empresa=request.user.empresa)
+        .select_related('cliente', 'empresa')
+        .prefetch_related('itens__item'),
+        id=orcamento_id
+    )
     try:
-        empresa = orcamento.empresa
-        pdf, png = gerar_arquivos(orcamento, empresa)
-        
-        # Atualiza o orçamento com os novos arquivos
-        orcamento.pdf = pdf
-        orcamento.png = png
-        orcamento.save()
-        
-        # Serve o arquivo recém-criado
-        file_path = orcamento.pdf.path
+        if fila_ativa():
+            # Nunca renderiza na requisição: serve o documento pronto ou mostra o estado da fila
+            documento = documento_pronto(orcamento)
+            if documento is None:
+                enfileirar_documento(orcamento)
+                return render(request, "orcamentos/gerando_documento.html", {"orcamento": orcamento})
+            arquivo = documento.arquivo.open('rb')
+        else:
+            # Reaproveita o PDF em cache se nada que afeta o documento mudou (ou renderiza em memória)
+            arquivo = abrir_pdf(orcamento)
         filename = f'Orcamento_{orcamento.cliente.nome}.pdf'
-        
-        response = FileResponse(open(file_path, 'rb'), content_type='application/pdf')
+        response = FileResponse(arquivo, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
         
@@ -637,6 +593,104 @@ def gerar_e_baixar_pdf(request, orcamento):
         messages.error(request, 'Erro ao gerar o arquivo PDF.')
         return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento.id)
     
+@login_required
+@acesso_empresa_required
+def exportar_orcamentos(request):
+    """Exporta de uma vez os documentos dos orçamentos filtrados (ZIP ou PDF único)"""
+    def data_param(nome):
+        try:
+            return datetime.strptime(request.GET.get(nome, ''), '%Y-%m-%d').date()
+        except ValueError:
+            return None
+
+    orcamentos = orcamentos_para_exportar(
+        request.user.empresa,
+        inicio=data_param('inicio'),
+        fim=data_param('fim'),
+        status=request.GET.get('status'),
+    )
+    if not orcamentos.exists():
+        messages.warning(request, 'Nenhum orçamento encontrado para exportar.')
+        return redirect('orcamentos:lista_orcamentos')
+
+    stamp = timezone.localdate().strftime('%Y-%m-%d')
+    # Na requisição o render roda no próprio processo, salvo se o admin liberar o pool
+    # (o comando exportar_orcamentos usa um processo por núcleo)
+    processos = getattr(settings, 'EXPORTACAO_PROCESSOS_WEB', 1)
+    if request.GET.get('formato') == 'pdf':
+        # O PDF juntado precisa ser montado por inteiro; vai para um arquivo temporário, não para a memória
+        arquivo = tempfile.TemporaryFile()
+        exportar_pdf_unico(orcamentos, arquivo, processos)
+        arquivo.seek(0)
+        return FileResponse(arquivo, as_attachment=True, filename=f'orcamentos_{stamp}.pdf',
+                            content_type='application/pdf')
+
+    response = StreamingHttpResponse(exportar_zip(orcamentos, processos), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="orcamentos_{stamp}.zip"'
+    return response
+
+@login_required
+@acesso_empresa_required
+def baixar_imagem(request, orcamento_id):
+    """Página do PDF do orçamento em imagem (PNG/JPEG/WebP) para compartilhar no WhatsApp"""
+    orcamento = get_object_or_404(
+        Orcamento.objects.filter(empresa=request.user.empresa)
+        .select_related('cliente', 'empresa')
+        .prefetch_related('itens__item'),
+        id=orcamento_id
+    )
+    formato = request.GET.get('formato', 'png')
+    if formato not in FORMATOS_IMAGEM:
+        formato = 'png'
+    try:
+        pagina = max(1, int(request.GET.get('pagina', 1)))
+    except ValueError:
+        pagina = 1
+
+    if not rasterizacao_disponivel():
+        messages.error(request, 'Download em imagem indisponível neste servidor (pdf2image/poppler não instalados). '
+                                'Baixe o orçamento em PDF.')
+        return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento.id)
+
+    if fila_ativa() and documento_pronto(orcamento) is None:
+        enfileirar_documento(orcamento)
+        messages.info(request, 'O documento está sendo gerado. Tente novamente em alguns instantes.')
+        return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento.id)
+
+    try:
+        imagem = obter_imagem(orcamento, pagina=pagina, dpi=request.GET.get('dpi'), formato=formato)
+    except Exception:
+        messages.error(request, 'Erro ao gerar a imagem do orçamento.')
+        return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento.id)
+    if imagem is None:
+        raise Http404('Página inexistente')
+
+    extensao = 'jpg' if formato == 'jpeg' else formato
+    return FileResponse(
+        imagem.arquivo.open('rb'),
+        content_type=FORMATOS_IMAGEM[formato][1],
+        as_attachment=request.GET.get('download') == '1',
+        filename=f'Orcamento_{orcamento.cliente.nome}_p{pagina}.{extensao}',
+    )
+
+@login_required
+@acesso_empresa_required
+def status_pdf(request, orcamento_id):
+    """Consultado pela página de espera enquanto o worker renderiza o documento"""
+    orcamento = get_object_or_404(
+        Orcamento.objects.filter(empresa=request.user.empresa)
+        .select_related('cliente', 'empresa')
+        .prefetch_related('itens__item'),
+        id=orcamento_id
+    )
+    status = status_documento(orcamento)
+    if status == 'renderizando':
+        enfileirar_documento(orcamento)
+    return JsonResponse({
+        'status': status,
+        'url': reverse('orcamentos:baixar_pdf', args=[orcamento.id]),
+    })
+    
 @login_required
 @acesso_empresa_required
 def alterar_status(request, orcamento_id):
@@ -655,10 +709,8 @@ def alterar_status(request, orcamento_id):
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({'success': False, 'error': 'Status inválido'}, status=400)
             return redirect("orcamentos:detalhes_orcamento", orcamento_id=orcamento_id)
-        #apaga o pdf e png se o status for alterado para pendente
-        if orcamento.pdf and os.path.exists(orcamento.pdf.path):
-            os.remove(orcamento.pdf.path)
-            orcamento.pdf = None
+        # O documento muda com o status: os arquivos atuais vão para a fila de descarte
+        descartar_documentos_orcamento(orcamento)
         # Altera o status
         orcamento.status = novo_status
         print(f"Alterando status do orçamento #{orcamento_id} para {novo_status}")
@@ -666,6 +718,7 @@ def alterar_status(request, orcamento_id):
             print("Orçamento concluído, marcando como pago.")
             orcamento.valor_pago = orcamento.total
         orcamento.save()
+        enfileirar_documento(orcamento)
         
         # Mensagem de sucesso
         status_display = dict(Orcamento.STATUS_CHOICES).get(novo_status, novo_status)
@@ -694,7 +747,7 @@ def alterar_status(request, orcamento_id):
 def lista_clientes(request):
     busca = request.GET.get('busca', '')
     ordenacao = request.GET.get('ordenacao', 'nome')
-    page_number = request.GET.get('page', 1)
+    cursor = request.GET.get('cursor')
     
     # Apenas clientes da empresa do usuário
     clientes = Cliente.objects.filter(empresa=request.user.empresa)
@@ -705,19 +758,23 @@ def lista_clientes(request):
             Q(telefone__icontains=busca)
         )
     
-    if ordenacao == 'nome':
-        clientes = clientes.order_by('nome')
-    elif ordenacao == 'data_cadastro':
-        clientes = clientes.order_by('-data_cadastro')
+    # Paginação por cursor: chaves de ordenação + id
+    nulos = ()
+    if ordenacao == 'data_cadastro':
+        chaves = ('-data_cadastro', '-id')
     elif ordenacao == 'ultimo_orcamento':
-        clientes = clientes.annotate(
-            ultima_data=Max('orcamentos__data_criacao')
-        ).order_by('-ultima_data')
+        # Subconsulta em vez de Max com GROUP BY, para o cursor filtrar no WHERE;
+        # clientes sem orçamento ficam no fim
+        clientes = clientes.annotate(ultima_data=Subquery(
+            Orcamento.objects.filter(cliente=OuterRef('pk')).order_by('-data_criacao').values('data_criacao')[:1]
+        ))
+        chaves, nulos = ('-ultima_data', '-id'), ('ultima_data',)
+    else:
+        chaves = ('nome', 'id')
     
-    paginator = Paginator(clientes, 20)
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginar_por_cursor(clientes, chaves, cursor, por_pagina=20, nulos=nulos)
     
-    total_clientes = clientes.count()
+    total_clientes = contar(clientes)
     clientes_com_orcamento = Orcamento.objects.filter(
         empresa=request.user.empresa
     ).values('cliente').distinct().count()
@@ -744,9 +801,7 @@ def cliente_detalhes(request, cliente_id):
     orcamentos_confirmados = orcamentos.filter(status='confirmado').count()
     orcamentos_concluidos = orcamentos.filter(status='concluido').count()
     
-    valor_total = 0
-    for orcamento in orcamentos:
-        valor_total += orcamento.total
+    valor_total = orcamentos.aggregate(soma=Sum('total'))['soma'] or 0
     
     context = {
         'cliente': cliente,
@@ -798,19 +853,45 @@ def novo_cliente(request):
     return render(request, "orcamentos/adicionar_cliente.html", {"form": form})
 
 # Views para Itens (filtrados por empresa)
+# Ordenações aceitas em lista_itens: valor do parâmetro -> order_by
+ORDENACOES_ITENS = {
+    'nome': ('nome', 'descricao'),
+    'mais_usados': ('-uso_count', 'nome'),
+    'faturamento': ('-faturamento', 'nome'),
+    'ultima_locacao': (F('ultima_locacao').desc(nulls_last=True), 'nome'),
+    'valor': ('-valor_unitario', 'nome'),
+}
+
 @login_required
 def lista_itens(request):
-    itens = Item.objects.filter(empresa=request.user.empresa)
-    #buscando a quantidade de orçamentos confirmados ou concluídos que possuem cada item
-    for item in itens:        
-        item.uso_count = OrcamentoItem.objects.filter(
-            item=item,
-            orcamento__empresa=request.user.empresa,
-            orcamento__status__in=['confirmado', 'concluido']
-        ).count()  
-        item.faturamento = (item.uso_count * item.valor_unitario) - ((item.uso_count * item.valor_unitario) * (35 / 100) if item.desconto else 0)
-    
-    return render(request, "orcamentos/itensLista.html", {"itens": itens})
+    ordenacao = request.GET.get('ordenacao', 'nome')
+    page_number = request.GET.get('page', 1)
+    if ordenacao not in ORDENACOES_ITENS:
+        ordenacao = 'nome'
+    
+    # Uso, faturamento e última locação consideram apenas orçamentos confirmados ou concluídos
+    locado = Q(
+        orcamentoitem__orcamento__empresa=request.user.empresa,
+        orcamentoitem__orcamento__status__in=['confirmado', 'concluido'],
+    )
+    itens = Item.objects.filter(empresa=request.user.empresa).annotate(
+        uso_count=Count('orcamentoitem', filter=locado),
+        faturamento=Coalesce(
+            Sum(expressao_valor_linha('orcamentoitem__'), filter=locado),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+        ultima_locacao=Max('orcamentoitem__orcamento__data_evento', filter=locado),
+    ).order_by(*ORDENACOES_ITENS[ordenacao])
+    
+    paginator = Paginator(itens, 24)
+    page_obj = paginator.get_page(page_number)
+    
+    return render(request, "orcamentos/itensLista.html", {
+        "itens": page_obj,
+        "page_obj": page_obj,
+        "ordenacao": ordenacao,
+    })
 
 @login_required
 def novo_item(request):
@@ -859,6 +940,9 @@ def excluir_item(request, item_id):
 
 
 # Views para Agendamentos (filtrados por empresa)
+# Status que consomem a capacidade diária da agenda
+STATUS_OCUPAM_AGENDA = ['confirmado', 'concluido', 'reagendar']
+
 @login_required
 def agendamentos(request):
     # Data atual
@@ -883,11 +967,11 @@ def agendamentos(request):
     mes_anterior = (mes_atual - timedelta(days=1)).replace(day=1)
     mes_proximo = (mes_atual + timedelta(days=32)).replace(day=1)
     
-    # Apenas orçamentos da empresa do usuário
+    # Apenas orçamentos da empresa do usuário (o cliente aparece em cada cartão)
     orcamentos = Orcamento.objects.filter(
         empresa=request.user.empresa, 
         status__in=['confirmado', 'concluido', 'reagendado']  # Excluir pendentes e cancelados
-    )
+    ).select_related('cliente')
     
     # Orçamentos pendentes de conclusão (confirmados com data passada)
     orcamentos_para_concluir = orcamentos.filter(
@@ -939,25 +1023,40 @@ def agendamentos(request):
         empresa=request.user.empresa,
         status='concluido',
         data_evento__gte=hoje - timedelta(days=30)
-    ).order_by('-data_evento')
+    ).select_related('cliente').order_by('-data_evento')
     
-    # Gerar calendário para o mês atual
+    # Gerar calendário para o mês atual (6 semanas)
     primeiro_dia_semana = (mes_atual - timedelta(days=mes_atual.weekday()))
+    ultimo_dia_calendario = primeiro_dia_semana + timedelta(days=41)
+    capacidade = request.user.empresa.capacidade_diaria
+    
+    # Uma única consulta agrupada traz a contagem por dia e status da janela visível
+    contagem_por_dia = {}
+    for linha in (Orcamento.objects
+                  .filter(empresa=request.user.empresa,
+                          data_evento__range=[primeiro_dia_semana, ultimo_dia_calendario])
+                  .exclude(status='cancelado')
+                  .order_by()
+                  .values('data_evento', 'status')
+                  .annotate(quantidade=Count('id'))):
+        contagem_por_dia.setdefault(linha['data_evento'], {})[linha['status']] = linha['quantidade']
     
     dias_calendario = []
     for i in range(42):  # 6 semanas
         dia = primeiro_dia_semana + timedelta(days=i)
-        tem_eventos = Orcamento.objects.filter(
-            empresa=request.user.empresa,
-            data_evento=dia,
-            status__in=['confirmado', 'pendente']
-        ).exists()
+        por_status = contagem_por_dia.get(dia, {})
+        ocupados = sum(por_status.get(status, 0) for status in STATUS_OCUPAM_AGENDA)
         
         dias_calendario.append({
             'dia': dia.day,
             'data': dia.strftime('%Y-%m-%d'),
             'hoje': dia == hoje,
-            'eventos': tem_eventos,
+            'eventos': bool(por_status.get('confirmado') or por_status.get('pendente')),
+            'total_eventos': sum(por_status.values()),
+            'ocupados': ocupados,
+            'pendentes': por_status.get('pendente', 0),
+            'capacidade': capacidade,
+            'lotado': ocupados >= capacidade,
             'mes_atual': dia.month == mes_atual.month
         })
     
@@ -1000,11 +1099,10 @@ def concluir_agendamento(request, orcamento_id):
             orcamento.observacoes += f"\n\n--- CONCLUSÃO ---\n{observacoes_conclusao}"
         
         orcamento.valor_pago = orcamento.total  # Marca como totalmente pago
-        if orcamento.pdf and os.path.exists(orcamento.pdf.path):
-            os.remove(orcamento.pdf.path)
-            orcamento.pdf = None
+        descartar_documentos_orcamento(orcamento)
         
         orcamento.save()
+        enfileirar_documento(orcamento)
         
         messages.success(request, f'Agendamento #{orcamento.id} concluído com sucesso!')
         return redirect('orcamentos:agendamentos')
@@ -1019,8 +1117,46 @@ def reabrir_agendamento(request, orcamento_id):
     if request.method == 'POST':
         orcamento.status = 'confirmado'
         orcamento.save()
+        enfileirar_documento(orcamento)
         
         messages.success(request, f'Agendamento #{orcamento.id} reaberto com sucesso!')
         return redirect('orcamentos:agendamentos')
     
-    return redirect('orcamentos:agendamentos')
\ No newline at end of file
+    return redirect('orcamentos:agendamentos')
+
+
+def _medicoes_filtradas(request):
+    medicoes = registro.medicoes()
+    url = request.GET.get('url')
+    empresa = request.GET.get('empresa')
+    if url:
+        medicoes = [m for m in medicoes if m['url'] == url]
+    if empresa:
+        medicoes = [m for m in medicoes if str(m['empresa_id']) == empresa]
+    return medicoes
+
+
+@staff_member_required
+def desempenho(request):
+    """Consultas e tempos das últimas requisições medidas pela instrumentação"""
+    if request.method == 'POST':
+        registro.limpar()
+        messages.success(request, 'Registro de desempenho limpo.')
+        return redirect('orcamentos:desempenho')
+
+    medicoes = _medicoes_filtradas(request)
+    return render(request, 'orcamentos/desempenho.html', {
+        'ativo': settings.INSTRUMENTACAO,
+        'resumo': registro.resumo(medicoes),
+        'medicoes': sorted(medicoes, key=lambda m: m['tempo_ms'], reverse=True)[:50],
+    })
+
+
+@staff_member_required
+def desempenho_json(request):
+    medicoes = _medicoes_filtradas(request)
+    return JsonResponse({
+        'ativo': settings.INSTRUMENTACAO,
+        'resumo': registro.resumo(medicoes),
+        'medicoes': medicoes,
+    })
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import ResumoMensal
 
-# Register your models here.
+@admin.register(ResumoMensal)
+class ResumoMensalAdmin(admin.ModelAdmin):
+    list_display = ['empresa', 'mes', 'status', 'quantidade', 'valor_total', 'valor_pago', 'custo_operacional']
+    list_filter = ['empresa', 'status', 'mes']
+    list_select_related = ['empresa']
+    date_hierarchy = 'mes'
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from relatorios.models import ResumoMensal
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói a tabela de resumo mensal (empresa, mês, status) a partir dos orçamentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresa', type=int, help='Limita a uma empresa (id)')
+
+    def handle(self, *args, **options):
+        linhas = ResumoMensal.reconstruir(empresa_id=options['empresa'])
+        self.stdout.write(self.style.SUCCESS(f'{linhas} linhas de resumo mensal gravadas.'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0003_empresa_cidade_empresa_instagram_empresa_whatsapp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('confirmado', 'Confirmado'), ('cancelado', 'Cancelado'), ('concluido', 'Concluído'), ('reagendar', 'Reagendado')], max_length=20)),
+                ('quantidade', models.PositiveIntegerField(default=0)),
+                ('valor_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('valor_pago', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('custo_operacional', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_mensais', to='accounts.empresa')),
+            ],
+            options={
+                'verbose_name': 'Resumo Mensal',
+                'verbose_name_plural': 'Resumos Mensais',
+                'constraints': [models.UniqueConstraint(fields=('empresa', 'mes', 'status'), name='resumo_mensal_empresa_mes_status')],
+            },
+        ),
+    ]
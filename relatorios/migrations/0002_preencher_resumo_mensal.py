@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def preencher_resumos(apps, schema_editor):
+    Orcamento = apps.get_model('orcamentos', 'Orcamento')
+    ResumoMensal = apps.get_model('relatorios', 'ResumoMensal')
+    linhas = (
+        Orcamento.objects
+        .filter(data_evento__isnull=False)
+        .annotate(mes_evento=TruncMonth('data_evento'))
+        .order_by()
+        .values('empresa_id', 'mes_evento', 'status')
+        .annotate(
+            quantidade=Count('id'),
+            soma_total=Sum('total'),
+            soma_pago=Sum('valor_pago'),
+            soma_custo=Sum('custo_operacional'),
+        )
+    )
+    ResumoMensal.objects.bulk_create([
+        ResumoMensal(
+            empresa_id=linha['empresa_id'],
+            mes=linha['mes_evento'].date() if isinstance(linha['mes_evento'], datetime) else linha['mes_evento'],
+            status=linha['status'],
+            quantidade=linha['quantidade'],
+            valor_total=linha['soma_total'] or 0,
+            valor_pago=linha['soma_pago'] or 0,
+            custo_operacional=linha['soma_custo'] or 0,
+        )
+        for linha in linhas
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relatorios', '0001_initial'),
+        ('orcamentos', '0017_orcamento_subtotal_total_saldo'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
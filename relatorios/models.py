@@ -1,3 +1,112 @@
-from django.db import models
+from datetime import date, datetime
 
-# Create your models here.
+from django.db import models, transaction
+from django.db.models import Sum, Count
+from django.db.models.functions import TruncMonth
+from accounts.models import Empresa
+from orcamentos.models import Orcamento
+
+
+def primeiro_dia_do_mes(data):
+    """Normaliza date/datetime/'YYYY-MM-DD' para o primeiro dia do mês (ou None)"""
+    if not data:
+        return None
+    if isinstance(data, str):
+        try:
+            data = datetime.strptime(data[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return None
+    if isinstance(data, datetime):
+        data = data.date()
+    return date(data.year, data.month, 1)
+
+
+class ResumoMensal(models.Model):
+    """Totais dos orçamentos de uma empresa por mês do evento e status"""
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='resumos_mensais')
+    mes = models.DateField() # primeiro dia do mês do evento
+    status = models.CharField(max_length=20, choices=Orcamento.STATUS_CHOICES)
+    quantidade = models.PositiveIntegerField(default=0)
+    valor_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    valor_pago = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    custo_operacional = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.empresa} - {self.mes:%m/%Y} - {self.get_status_display()}"
+
+    @staticmethod
+    def _agregar(orcamentos):
+        return (
+            orcamentos
+            .filter(data_evento__isnull=False)
+            .annotate(mes_evento=TruncMonth('data_evento'))
+            .order_by()
+            .values('empresa_id', 'mes_evento', 'status')
+            .annotate(
+                quantidade=Count('id'),
+                soma_total=Sum('total'),
+                soma_pago=Sum('valor_pago'),
+                soma_custo=Sum('custo_operacional'),
+            )
+        )
+
+    @classmethod
+    def _de_linha(cls, linha):
+        mes = linha['mes_evento']
+        return cls(
+            empresa_id=linha['empresa_id'],
+            mes=mes.date() if isinstance(mes, datetime) else mes,
+            status=linha['status'],
+            quantidade=linha['quantidade'],
+            valor_total=linha['soma_total'] or 0,
+            valor_pago=linha['soma_pago'] or 0,
+            custo_operacional=linha['soma_custo'] or 0,
+        )
+
+    @staticmethod
+    def _travar_empresa(empresa_id):
+        # Dois recálculos da mesma empresa ao mesmo tempo apagariam e recriariam
+        # as mesmas linhas (IntegrityError na UniqueConstraint): o segundo espera
+        # o primeiro, e agrega depois dele
+        list(Empresa.objects.select_for_update().filter(pk=empresa_id).values_list('pk', flat=True))
+
+    @classmethod
+    def recalcular(cls, empresa_id, mes):
+        """Recalcula as linhas de um único (empresa, mês) a partir dos orçamentos"""
+        mes = primeiro_dia_do_mes(mes)
+        if not empresa_id or mes is None:
+            return
+        proximo = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+        with transaction.atomic():
+            cls._travar_empresa(empresa_id)
+            linhas = cls._agregar(Orcamento.objects.filter(
+                empresa_id=empresa_id,
+                data_evento__gte=mes,
+                data_evento__lt=proximo,
+            ))
+            cls.objects.filter(empresa_id=empresa_id, mes=mes).delete()
+            cls.objects.bulk_create([cls._de_linha(linha) for linha in linhas])
+
+    @classmethod
+    def reconstruir(cls, empresa_id=None):
+        """Reconstrói todo o resumo (de uma empresa ou de todas). Retorna o número de linhas"""
+        orcamentos = Orcamento.objects.all()
+        resumos = cls.objects.all()
+        if empresa_id:
+            orcamentos = orcamentos.filter(empresa_id=empresa_id)
+            resumos = resumos.filter(empresa_id=empresa_id)
+        with transaction.atomic():
+            if empresa_id:
+                cls._travar_empresa(empresa_id)
+            novos = [cls._de_linha(linha) for linha in cls._agregar(orcamentos)]
+            resumos.delete()
+            cls.objects.bulk_create(novos, batch_size=500)
+        return len(novos)
+
+    class Meta:
+        verbose_name = "Resumo Mensal"
+        verbose_name_plural = "Resumos Mensais"
+        constraints = [
+            models.UniqueConstraint(fields=['empresa', 'mes', 'status'], name='resumo_mensal_empresa_mes_status'),
+        ]
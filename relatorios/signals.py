@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from orcamentos.models import Orcamento
+from orcamentos.transacoes import ao_confirmar
+from .models import ResumoMensal, primeiro_dia_do_mes
+
+# Campos do orçamento que entram no resumo mensal
+CAMPOS_RESUMO = ('empresa', 'data_evento', 'status', 'total', 'valor_pago', 'custo_operacional')
+ATRIBUTOS_RESUMO = tuple(Orcamento._meta.get_field(campo).attname for campo in CAMPOS_RESUMO)
+
+
+def _chave_resumo(orcamento):
+    # __dict__ evita disparar consultas para campos adiados (.only()/.defer())
+    return (orcamento.__dict__.get('empresa_id'), primeiro_dia_do_mes(orcamento.__dict__.get('data_evento')))
+
+
+def _resumo(valores):
+    """O que o orçamento soma no resumo: (empresa, mês), status e valores"""
+    # Valores vindos de formulário podem ser float/str; Decimal('10') == Decimal('10.00')
+    return (
+        valores['empresa_id'],
+        primeiro_dia_do_mes(valores['data_evento']),
+        valores['status'],
+        *(Decimal(str(valores[campo] or 0)) for campo in ('total', 'valor_pago', 'custo_operacional')),
+    )
+
+
+def _recalcular_meses(chaves):
+    # Sempre na mesma ordem, para dois workers não travarem as empresas em ordens opostas
+    for empresa_id, mes in sorted(chave for chave in chaves if all(chave)):
+        ResumoMensal.recalcular(empresa_id, mes)
+
+
+def agendar_resumo(chaves):
+    """Recalcula os (empresa, mês) no commit, uma vez cada por transação"""
+    ao_confirmar('resumo_mensal', chaves, _recalcular_meses)
+
+
+@receiver(pre_save, sender=Orcamento)
+def guardar_resumo_original(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Lê do banco os valores que o orçamento soma hoje no resumo, para o post_save
+    só recalcular quando algum deles mudar (saves de pdf/totais iguais não mexem)
+    """
+    instance._resumo_original = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(CAMPOS_RESUMO) & set(update_fields):
+        return
+    instance._resumo_original = Orcamento.objects.filter(pk=instance.pk).values(*ATRIBUTOS_RESUMO).first()
+
+
+@receiver(post_save, sender=Orcamento)
+def atualizar_resumo_mensal(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Recalcula o mês do evento e, se a data mudou, também o mês anterior"""
+    if raw:
+        return
+    if created:
+        agendar_resumo([_chave_resumo(instance)])
+        return
+
+    original = getattr(instance, '_resumo_original', None)
+    if original is None:
+        return
+    # Só os campos gravados neste save (e carregados na instância) valem como novos
+    gravados = ATRIBUTOS_RESUMO if update_fields is None else {
+        Orcamento._meta.get_field(campo).attname for campo in update_fields
+    }
+    atuais = dict(original)
+    atuais.update({atributo: instance.__dict__[atributo] for atributo in ATRIBUTOS_RESUMO
+                   if atributo in gravados and atributo in instance.__dict__})
+    if _resumo(atuais) == _resumo(original):
+        return
+
+    agendar_resumo({_resumo(atuais)[:2], _resumo(original)[:2]})
+
+
+@receiver(post_delete, sender=Orcamento)
+def remover_do_resumo_mensal(sender, instance, **kwargs):
+    agendar_resumo([_chave_resumo(instance)])
@@ -1,3 +1,80 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Empresa
+from orcamentos.models import Cliente, Item, Orcamento, OrcamentoItem
+from .models import ResumoMensal
+
+
+class ResumoMensalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.empresa = Empresa.objects.create(nome='Empresa Teste')
+        cls.cliente = Cliente.objects.create(empresa=cls.empresa, nome='Ana', telefone='1')
+        cls.item = Item.objects.create(empresa=cls.empresa, descricao='Pula-pula', valor_unitario=Decimal('100'))
+
+    def setUp(self):
+        # O resumo é recalculado no commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orcamento = Orcamento.objects.create(
+                empresa=self.empresa, cliente=self.cliente, endereco='Rua A', data_evento=date(2026, 3, 14),
+            )
+            OrcamentoItem.objects.create(orcamento=self.orcamento, item=self.item, quantidade=2, valor=Decimal('100'))
+
+    def resumo(self):
+        return {
+            (linha.mes, linha.status): (linha.quantidade, linha.valor_total)
+            for linha in ResumoMensal.objects.filter(empresa=self.empresa)
+        }
+
+    def assertIgualAReconstrucao(self):
+        atual = self.resumo()
+        ResumoMensal.reconstruir(self.empresa.pk)
+        self.assertEqual(atual, self.resumo())
+
+    def test_novo_orcamento_entra_no_mes_do_evento(self):
+        self.assertEqual(self.resumo(), {(date(2026, 3, 1), 'pendente'): (1, Decimal('200.00'))})
+
+    def test_mudanca_de_status(self):
+        self.orcamento.status = 'confirmado'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orcamento.save()
+        self.assertEqual(self.resumo(), {(date(2026, 3, 1), 'confirmado'): (1, Decimal('200.00'))})
+        self.assertIgualAReconstrucao()
+
+    def test_mudanca_de_mes_atualiza_os_dois_meses(self):
+        self.orcamento.data_evento = date(2026, 4, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orcamento.save()
+        self.assertEqual(self.resumo(), {(date(2026, 4, 1), 'pendente'): (1, Decimal('200.00'))})
+        self.assertIgualAReconstrucao()
+
+    def test_save_sem_mudanca_no_resumo_nao_recalcula(self):
+        orcamento = Orcamento.objects.get(pk=self.orcamento.pk)
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            orcamento.save(update_fields=['pdf'])
+            orcamento.observacoes = 'Levar extensão'
+            orcamento.save()
+        tabela = ResumoMensal._meta.db_table
+        self.assertFalse([c for c in consultas.captured_queries if tabela in c['sql']])
+
+    def test_exclusao_remove_do_resumo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orcamento.delete()
+        self.assertEqual(self.resumo(), {})
 
-# Create your tests here.
+    def test_varias_linhas_na_transacao_recalculam_o_mes_uma_vez(self):
+        tabela = ResumoMensal._meta.db_table
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                for _ in range(5):
+                    OrcamentoItem.objects.create(
+                        orcamento=self.orcamento, item=self.item, quantidade=1, valor=Decimal('100'),
+                    )
+        exclusoes = [c for c in consultas.captured_queries if c['sql'].startswith(f'DELETE FROM "{tabela}"')]
+        self.assertEqual(len(exclusoes), 1)
+        self.assertEqual(self.resumo(), {(date(2026, 3, 1), 'pendente'): (1, Decimal('700.00'))})
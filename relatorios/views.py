@@ -1,11 +1,76 @@
 # relatorios/views.py
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from orcamentos.models import Orcamento, OrcamentoItem, Cliente
+from orcamentos.models import Cliente
+from .models import ResumoMensal
+
+# Status que representam receita efetivada (sinal pago ou evento realizado)
+STATUS_EFETIVADOS = ['confirmado', 'concluido', 'reagendar']
+
+
+def somar_meses(data, meses):
+    """Primeiro dia do mês deslocado `meses` meses a partir de `data`"""
+    indice = data.year * 12 + (data.month - 1) + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def resumo_vazio():
+    return {
+        'quantidade': 0,
+        'confirmados': 0,
+        'concluidos': 0,
+        'pendentes': 0,
+        'cancelados': 0,
+        'reagendados': 0,
+        'valor_total': Decimal('0.00'),
+        'total_efetivado': Decimal('0.00'),
+        'total_confirmado': Decimal('0.00'),
+        'total_concluido': Decimal('0.00'),
+        'total_reagendado': Decimal('0.00'),
+        'pago': Decimal('0.00'),
+        'pago_efetivado': Decimal('0.00'),
+        'custo': Decimal('0.00'),
+    }
+
+
+def resumo_mensal(empresa, inicio, fim):
+    """
+    Lê os totais mensais da tabela de resumo (uma linha por mês e status).
+    Retorna {primeiro_dia_do_mes: {métrica: valor}} apenas para meses com eventos.
+    """
+    contadores = {
+        'confirmado': 'confirmados',
+        'concluido': 'concluidos',
+        'pendente': 'pendentes',
+        'cancelado': 'cancelados',
+        'reagendar': 'reagendados',
+    }
+    totais_por_status = {
+        'confirmado': 'total_confirmado',
+        'concluido': 'total_concluido',
+        'reagendar': 'total_reagendado',
+    }
+
+    resumo = {}
+    linhas = ResumoMensal.objects.filter(empresa=empresa, mes__gte=inicio, mes__lte=fim)
+    for linha in linhas:
+        valores = resumo.setdefault(linha.mes, resumo_vazio())
+        valores['quantidade'] += linha.quantidade
+        valores['valor_total'] += linha.valor_total
+        valores['pago'] += linha.valor_pago
+        if linha.status in contadores:
+            valores[contadores[linha.status]] += linha.quantidade
+        if linha.status in totais_por_status:
+            valores[totais_por_status[linha.status]] += linha.valor_total
+        if linha.status in STATUS_EFETIVADOS:
+            valores['total_efetivado'] += linha.valor_total
+            valores['pago_efetivado'] += linha.valor_pago
+            valores['custo'] += linha.custo_operacional
+    return resumo
+
 
 @login_required
 # comentario de varias linhas
@@ -20,7 +85,7 @@ def dashboard_relatorios(request):
     mes_selecionado = request.GET.get('mes')
     if mes_selecionado:
         try:
-            data_selecionada = datetime.strptime(mes_selecionado, '%Y-%m')
+            data_selecionada = datetime.strptime(mes_selecionado, '%Y-%m').date()
             primeiro_dia_mes = data_selecionada.replace(day=1)
             ultimo_dia_mes = (primeiro_dia_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
         except ValueError:
@@ -34,86 +99,33 @@ def dashboard_relatorios(request):
     mes_anterior = primeiro_dia_mes - timedelta(days=1)
     mes_proximo = ultimo_dia_mes + timedelta(days=1)
     
-    # Filtra apenas orçamentos da empresa do usuário
-    orcamentos = Orcamento.objects.filter(empresa=request.user.empresa)
-    
-    # Eventos que ocorreram no mês selecionado
-    eventos_mes = orcamentos.filter(
-        data_evento__gte=primeiro_dia_mes, 
-        data_evento__lte=ultimo_dia_mes
-    )
-    
-    # Inicializar totais
-    total_mes = Decimal('0.00')
-    total_pago = Decimal('0.00')
-    total_confirmado = Decimal('0.00')
-    total_concluido = Decimal('0.00')
-    total_reagendado = Decimal('0.00')
-    custo_operacional_total = Decimal('0.00')
-    
-    # Contadores de status
-    orcamentos_confirmados = 0
-    orcamentos_concluidos = 0
-    orcamentos_pendentes = 0
-    orcamentos_cancelados = 0
-    orcamentos_reagendados = 0
-    
-    # Calcular totais manualmente iterando pelos orçamentos
-    for orcamento in eventos_mes:
-        #print(orcamento.status, orcamento.total, orcamento.valor_pago, orcamento.id)
-        total_mes += orcamento.total
-        if orcamento.status in ['confirmado', 'concluido', 'reagendar']:
-            total_pago += orcamento.valor_pago
-            custo_operacional_total += orcamento.custo_operacional
-        
-        #print("Total pago parcial:", total_pago, "após orcamento", orcamento.id)
-        
-        if orcamento.status == 'confirmado':
-            orcamentos_confirmados += 1
-            total_confirmado += orcamento.total
-        elif orcamento.status == 'concluido':
-            orcamentos_concluidos += 1
-            total_concluido += orcamento.total
-        elif orcamento.status == 'pendente':
-            orcamentos_pendentes += 1
-        elif orcamento.status == 'cancelado':
-            orcamentos_cancelados += 1
-        elif orcamento.status == 'reagendar':
-            total_reagendado += orcamento.total
-            orcamentos_reagendados += 1
-    #print("Total mês:", total_mes)
-    #print("Total pago:", total_pago)
-    #print("Total confirmado:", total_confirmado)
-    #print("Total concluído:", total_concluido)
-    #print("Total reagendado:", total_reagendado)
-    
-    total_orcamentos = eventos_mes.count()
-    
-    # Calcular valores do mês anterior para comparação
-    mes_anterior_inicio = (primeiro_dia_mes - timedelta(days=1)).replace(day=1)
-    mes_anterior_fim = primeiro_dia_mes - timedelta(days=1)
-    
-    eventos_mes_anterior = orcamentos.filter(
-        data_evento__gte=mes_anterior_inicio,
-        data_evento__lte=mes_anterior_fim
-    )
-    
-    # Calcular totais do mês anterior manualmente
-    total_mes_anterior = Decimal('0.00')
-    total_pago_anterior = Decimal('0.00')
-    total_confirmado_anterior = Decimal('0.00')
-    total_orcamentos_anterior = eventos_mes_anterior.count()
-    custo_operacional_total_anterior = Decimal('0.00')
-    
-    for orcamento in eventos_mes_anterior:
-        if orcamento.status in ['confirmado', 'concluido', 'reagendar']:
-            total_mes_anterior += orcamento.total
-            custo_operacional_total_anterior += orcamento.custo_operacional
-        
-        total_pago_anterior += orcamento.valor_pago
-        
-        if orcamento.status == 'confirmado':
-            total_confirmado_anterior += orcamento.total
+    # A tabela de resumo mensal (mantida pelos signals de Orcamento) cobre o mês
+    # selecionado, o anterior e a janela de 6 meses do gráfico em uma consulta
+    meses_grafico = [somar_meses(primeiro_dia_mes, -i) for i in range(5, -1, -1)]
+    resumo = resumo_mensal(request.user.empresa, meses_grafico[0], primeiro_dia_mes)
+    atual = resumo.get(primeiro_dia_mes) or resumo_vazio()
+    anterior = resumo.get(somar_meses(primeiro_dia_mes, -1)) or resumo_vazio()
+    
+    total_mes = atual['valor_total']
+    total_pago = atual['pago_efetivado']
+    total_confirmado = atual['total_confirmado']
+    total_concluido = atual['total_concluido']
+    total_reagendado = atual['total_reagendado']
+    custo_operacional_total = atual['custo']
+    
+    orcamentos_confirmados = atual['confirmados']
+    orcamentos_concluidos = atual['concluidos']
+    orcamentos_pendentes = atual['pendentes']
+    orcamentos_cancelados = atual['cancelados']
+    orcamentos_reagendados = atual['reagendados']
+    total_orcamentos = atual['quantidade']
+    
+    # Valores do mês anterior para comparação
+    total_mes_anterior = anterior['total_efetivado']
+    total_pago_anterior = anterior['pago']
+    total_confirmado_anterior = anterior['total_confirmado']
+    total_orcamentos_anterior = anterior['quantidade']
+    custo_operacional_total_anterior = anterior['custo']
     
     # Calcular comparações percentuais
     def calcular_comparacao(atual, anterior):
@@ -130,28 +142,13 @@ def dashboard_relatorios(request):
     lucro_estimado_anterior = total_confirmado_anterior - custo_operacional_total_anterior
     lucro_estimado_atual = (total_confirmado + total_concluido + total_reagendado) - custo_operacional_total
     comparacao_lucro_estimado = calcular_comparacao(float(lucro_estimado_atual), float(lucro_estimado_anterior))
-    # Calcular evolução mensal (últimos 6 meses)
-    meses = []
-    valores_mensais = []
     
-    for i in range(5, -1, -1):  # Últimos 6 meses (do mais antigo ao mais recente)
-        mes_data = primeiro_dia_mes - timedelta(days=30*i)
-        mes_primeiro_dia = mes_data.replace(day=1)
-        mes_ultimo_dia = (mes_primeiro_dia + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        eventos_mes_historico = orcamentos.filter(
-            data_evento__gte=mes_primeiro_dia,
-            data_evento__lte=mes_ultimo_dia
-        )
-        
-        # Calcular total do mês histórico manualmente
-        total_mes_historico = Decimal('0.00')
-        for orcamento in eventos_mes_historico:
-            if orcamento.status in ['confirmado', 'concluido', 'reagendar']:
-                total_mes_historico += orcamento.total
-        
-        meses.append(mes_data.strftime('%b/%Y'))
-        valores_mensais.append(float(total_mes_historico))
+    # Evolução mensal (últimos 6 meses, do mais antigo ao mais recente)
+    meses = [mes.strftime('%b/%Y') for mes in meses_grafico]
+    valores_mensais = [
+        float((resumo.get(mes) or resumo_vazio())['total_efetivado'])
+        for mes in meses_grafico
+    ]
     
     # Novos clientes (últimos 30 dias)
     novos_clientes = Cliente.objects.filter(